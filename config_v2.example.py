@@ -186,6 +186,199 @@ MIN_DROP_12H = 5.0    # 12시간 최소 하락률 (%)
 #    - 균형: 3% / 5% (권장)
 #    - 둔감: 5% / 8%
 
+# ============================================
+# 9. 시간 제한 스캔 (--deadline 옵션)
+# ============================================
+
+DEADLINE_VALUE_WEIGHT = 1.0  # 우선순위 계산 시 거래대금 가중치
+# 💡 의미:
+#    --deadline 모드에서는 아래 우선순위가 높은 코인부터 분석
+#    우선순위 = 24시간 하락률(%) + 가중치 × log10(24시간 거래대금)
+# 💡 조정 가이드:
+#    - 0.5: 하락률 위주
+#    - 1.0: 균형 (권장)
+#    - 3.0: 거래대금 큰 코인 위주
+
+DEADLINE_RESERVE_RATIO = 0.2  # 캔들 수집 후 단계에 남겨둘 시간 비율
+# 💡 의미:
+#    캔들 수집은 제한 시간의 (1 - 비율)에서 멈추고, 남은 시간에 호가창/피처 계산/알림 발송/엑셀 저장
+#    예: --deadline 1500, 0.2 → 1200초까지 수집, 300초는 나머지 단계용
+# 💡 조정 가이드:
+#    - 코인 수가 많거나 알림이 많이 나가는 환경: 0.3
+#    - 기본: 0.2 (권장)
+
+UNCOVERED_FILE = "upbit_sell_uncovered.json"  # 시간 초과로 분석 못한 코인 기록 파일
+
+# ============================================
+# 10. 멀티코어 피처 계산
+# ============================================
+
+COMPUTE_WORKERS = 0  # 피처 계산에 쓸 프로세스 수 (0 = CPU 코어 수)
+PARALLEL_MIN_MARKETS = 300  # 코인이 이 개수 미만이면 현재 프로세스에서 계산
+# 💡 의미:
+#    캔들을 모두 받은 뒤 지표 계산은 순수 CPU 작업
+#    코인이 많으면 캔들 배열을 공유메모리에 올려 여러 코어가 나눠 계산
+#    원화 마켓(~200개)은 기본값이면 현재 프로세스에서 계산 (프로세스 생성 비용이 더 큼)
+# 💡 확인 방법:
+#    python upbit_sell_signal_monitor_v2.py --benchmark 5000
+
+# ============================================
+# 11. 피처 스냅샷 (전체 코인 분석값 기록)
+# ============================================
+
+SNAPSHOT_ENABLED = True     # 스캔마다 전체 코인의 피처 벡터 + 점수 저장
+SNAPSHOT_DIR = "snapshots"  # 저장 폴더 (date=YYYY-MM-DD 하위 폴더로 나눠 저장)
+# 💡 의미:
+#    알림이 안 간 코인도 "왜 안 갔는지" 분석할 수 있도록 모든 값을 기록
+#    스캔 1회 = 압축 파일 1개, 컬럼별로 따로 저장되어 필요한 컬럼만 읽기 가능
+# 📊 예시 (몇 주치 quick_drop만 읽기):
+#    from upbit_sell_signal_monitor_v2 import load_snapshot_column
+#    df = load_snapshot_column('quick_drop', '2025-01-01', '2025-01-31')
+
+# ============================================
+# 12. API 속도 제한 / 과거 캔들 캐시
+# ============================================
+
+UPBIT_RATE_LIMIT = 8  # 업비트 초당 최대 요청 수 (모든 요청이 공유)
+# 💡 업비트 시세 API 제한은 초당 10회 → 여유를 두고 8회 권장
+
+BOOTSTRAP_WORKERS = 4  # 200개 페이지를 동시에 요청할 스레드 수
+CANDLE_CACHE_DIR = "candle_cache"  # 지난 캔들 페이지 캐시 폴더
+# 💡 의미:
+#    MINUTE_10_COUNT를 200개 넘게(며칠치) 늘리면 200개 페이지로 나눠 병렬 요청
+#    이미 끝난 페이지는 캐시에 저장 → 다음 실행부터는 최신 페이지만 요청
+# 📊 과거 데이터 채우기:
+#    python upbit_sell_signal_monitor_v2.py --bootstrap 2025-01-01 2025-02-01 --interval minute10
+
+# ============================================
+# 13. 알림 프로필 (한 번 스캔으로 여러 기준/채팅방)
+# ============================================
+
+PROFILES = {}  # 추가 프로필 없음 (위 설정 = '기본' 프로필)
+# 💡 의미:
+#    캔들/호가창/지표는 한 번만 수집·계산하고, 프로필마다 점수/단계/필터만 다시 적용
+#    → 프로필을 늘려도 API 호출은 그대로, 추가 계산 비용은 거의 없음
+# 💡 프로필별로 바꿀 수 있는 설정:
+#    CHAT_ID, QUICK_DROP_THRESHOLD, DROP_FROM_HIGH_12H_THRESHOLD, SURGE_6H_THRESHOLD,
+#    CHANGE_1H_THRESHOLD, VOLATILITY_THRESHOLD, ORDERBOOK_THRESHOLD, RSI_OVERBOUGHT,
+#    SELL_STAGE_REVIEW / PREPARE / IMMEDIATE, MIN_QUICK_DROP, MIN_DROP_12H
+#    (캔들 개수/룩백 기간 등 피처 계산 설정은 모든 프로필 공통)
+#    CHAT_ID 외에는 숫자만 가능 ('3'처럼 따옴표로 감싸면 오류), 프로필 이름 '기본'은 사용 불가
+# 📊 예시:
+# PROFILES = {
+#     '보수적': {
+#         'CHAT_ID': "OTHER_CHAT_ID",
+#         'QUICK_DROP_THRESHOLD': 8.0,
+#         'SELL_STAGE_REVIEW': 4,
+#         'SELL_STAGE_PREPARE': 6,
+#         'SELL_STAGE_IMMEDIATE': 8,
+#     },
+# }
+
+# ============================================
+# 14. 매도 신호 규칙 (코드 수정 없이 지표 추가/가중치 조정)
+# ============================================
+
+SIGNAL_RULES = None  # None = 기본 10개 지표 (DEFAULT_SIGNAL_RULES)
+# 💡 규칙 형식:
+#    'feature'  : 피처 이름 (quick_drop, drop_from_high_12h, surge_6h, change_1h, change_7d,
+#                 avg_volatility, volume_ratio, volume_declining, divergence_signal,
+#                 ask_bid_ratio, rsi, macd_signal, bb_signal, bb_position, ma_signal, stoch,
+#                 breadth_down_1h, median_quick_drop, btc_change_1h ...)
+#    'op'       : '>', '>=', '<', '<=', '==', '!=', 'in'(범주형 라벨 목록)
+#    'threshold': 숫자, 설정키 이름(문자열, 프로필별 값 적용), 또는 라벨
+#    'and'      : 함께 만족해야 하는 조건 [(피처, 연산자, 임계값), ...] (선택)
+#    'weight'   : 점수 가중치 (기본 1)
+#    'label'    : 발동 시 문구, {피처이름} 으로 값 삽입 가능 (호가창 없음 등 값이 없으면 '-')
+# 💡 만점 = 가중치 합 → SELL_STAGE_* 기준도 함께 조정하세요
+# 💡 시작/설정 재적용 시 검증: 없는 피처/설정키, 숫자가 아닌 임계값/가중치,
+#    라벨의 잘못된 {피처이름}/형식({quick_drop:.1f} 등)은 오류로 거부
+# 📊 예시 (upbit_sell_signal_monitor_v2.py의 DEFAULT_SIGNAL_RULES를 복사한 뒤 수정/추가):
+# SIGNAL_RULES = [
+#     {'feature': 'quick_drop', 'op': '>', 'threshold': 'QUICK_DROP_THRESHOLD', 'weight': 2,
+#      'label': "✅ 단기급락 {minutes_since_high}분전 -{quick_drop:.1f}%"},
+#     ...
+#     {'feature': 'ma_signal', 'op': '==', 'threshold': '하향돌파', 'weight': 2,
+#      'label': "✅ 이동평균 하향돌파"},
+# ]
+
+# ============================================
+# 15. 네거티브 캐시 (데이터 부족/반복 실패 코인 건너뛰기)
+# ============================================
+
+NEGATIVE_CACHE_FILE = "upbit_sell_negative_cache.json"  # 격리 코인 기록 (이유, 실패 횟수, 재시도 시각)
+NEGATIVE_CACHE_BASE_MINUTES = 30   # 요청 실패 시 첫 격리 시간
+NEGATIVE_CACHE_MAX_MINUTES = 1440  # 실패할 때마다 2배, 최대 24시간
+# 💡 데이터 부족 (10분봉 30개/60분봉 12개/일봉 20개 미만, 신규 상장 등):
+#    필요한 캔들이 쌓이는 예상 시각까지 건너뛰고 그 후 자동 재분석
+# 💡 요청 실패가 스캔의 절반 이상이면 API 장애로 보고 격리하지 않음
+# 💡 파일을 지우면 모든 코인을 다시 분석
+
+# ============================================
+# 16. 데몬 모드 (--daemon, 계속 실행)
+# ============================================
+
+DAEMON_INTERVAL = 600      # 스캔 간격(초)
+CONFIG_WATCH_SECONDS = 5   # 이 파일 변경 확인 간격(초)
+# 💡 실행 중 이 파일을 저장하면 다음 스캔 전에 자동 재적용 (재시작 불필요)
+#    - 규칙/프로필 검증에 실패하면 이전 설정 그대로 유지
+#    - 바뀐 설정에 영향받는 결과만 다시 계산:
+#      MINUTE_10_COUNT/MINUTE_60_COUNT → 캔들 재수집 (바로 다시 스캔)
+#      QUICK_DROP_LOOKBACK 등 피처 설정 → 받아둔 캔들로 피처 재계산
+#      RSI_OVERBOUGHT/STOCH_*/BB_HIGH_THRESHOLD → 지표 라벨 갱신 + 점수 재계산
+#      *_THRESHOLD/SELL_STAGE_*/PROFILES/SIGNAL_RULES → 점수 재계산만
+#      그 외 (BOT_TOKEN 등) → 다음 스캔부터 적용
+
+# ============================================
+# 17. 공유 캐시 (같은 서버의 매수/매도 모니터가 시세 공유)
+# ============================================
+
+SHARED_CACHE_ENABLED = False      # True: 캔들/호가창을 upbit_shared_cache로 다른 프로세스와 공유
+SHARED_CACHE_DIR = None           # None = /dev/shm/upbit_cache (메모리 기반, 모든 모니터가 같은 폴더 사용)
+SHARED_CACHE_MAX_TTL = 600        # 캔들 최대 유지 시간(초) - 진행 중인 봉이 끝나면 더 일찍 만료
+SHARED_CACHE_ORDERBOOK_TTL = 5    # 호가창 유지 시간(초)
+# 💡 같은 코인을 두 모니터가 동시에 요청해도 업비트 요청은 1번 (나머지는 기다렸다가 결과 사용)
+# 💡 스캔 요약에 적중률 표시 (서버 전체 누적: SHARED_CACHE_DIR/stats.json)
+# 💡 파일 잠금(fcntl)을 쓰므로 리눅스/맥에서만 동작 (윈도우에서는 자동으로 꺼짐)
+# 💡 매수/매도 모니터는 같은 사용자로 실행 (캐시 폴더가 다른 사용자 소유이거나 권한이 0700이 아니면
+#    경고 후 공유 캐시를 끄고 직접 요청)
+
+# ============================================
+# 18. 조회용 HTTP 엔드포인트 (데몬 모드)
+# ============================================
+
+QUERY_SERVER_PORT = 0             # 예: 8765 → http://127.0.0.1:8765/top (0 = 사용 안 함)
+QUERY_SERVER_HOST = "127.0.0.1"   # 다른 서버에서 접속하려면 "0.0.0.0" (인증 없음, 주의)
+QUERY_TOP_N = 20                  # /top 응답 코인 수
+# 💡 스캔이 끝날 때마다 응답을 미리 만들어 둠 → 조회 시 분석/업비트 요청 없음
+#    GET /markets/KRW-BTC  : 피처 벡터 + 프로필별 점수/단계 + 스캔 시각
+#    GET /top, /top/<프로필> : 점수 상위 코인
+# 💡 포트/주소 변경은 재시작 후 적용
+
+# ============================================
+# 19. 시장 전체 지표 (급락이 코인 개별인지 시장 전체인지)
+# ============================================
+
+BREADTH_DROP_1H = 3.0        # 1시간 -3% 이상 하락한 코인 비율을 집계
+BREADTH_ALERT_THRESHOLD = 0  # 예: 50 → 하락 코인 비율 50% 이상이면 개별 알림 대신 시장 전체 알림 1건 (0 = 사용 안 함)
+# 💡 스캔마다 1번 계산해서 모든 코인에 같은 값으로 붙임 (스냅샷/조회 엔드포인트에도 기록)
+#    breadth_down_1h  : 하락 코인 비율(%)
+#    median_quick_drop: 단기급락폭 중앙값(%)
+#    median_change_1h : 1시간 변화 중앙값(%)
+#    btc_change_1h    : 비트코인 1시간 변화(%)
+# 📊 SIGNAL_RULES에서 피처처럼 사용 가능 (예: 시장은 조용한데 혼자 급락하면 가산점)
+#    {'feature': 'breadth_down_1h', 'op': '<', 'threshold': 20, 'weight': 1,
+#     'label': "✅ 개별 급락 (시장 하락 {breadth_down_1h:.0f}%)"},
+
+# ============================================
+# 20. 감지 지연 측정 (캔들 마감 → 텔레그램 수신)
+# ============================================
+
+LATENCY_FILE = "upbit_sell_latency.json"  # 알림별 지연 기록 (캔들 마감/수집/점수 계산/텔레그램 수신 시각)
+LATENCY_WINDOW = 1000                     # 통계에 쓰는 최근 알림 수
+# 💡 스캔 요약과 엑셀 '감지지연' 시트에 실행방식(cron/deadline/daemon)별 p50/p95/p99 표시
+# 💡 엑셀 매도 신호 시트에는 알림마다 '감지지연(초)' 기록
+
 # ============================================
 # 📚 추천 프리셋
 # ============================================
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+조회용 HTTP 엔드포인트 테스트 (localhost, 업비트/텔레그램 요청 없음)
+- 빈 포트에 서버를 띄우고 가짜 스캔 결과를 publish → urllib로 조회
+
+실행: python -m pytest tests  (또는 python -m unittest discover tests)
+"""
+
+import os
+import sys
+import json
+import unittest
+import importlib.util
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# config.py가 없어도 예제 설정으로 import
+if 'config' not in sys.modules:
+    spec = importlib.util.spec_from_file_location('config', os.path.join(ROOT, 'config_v2.example.py'))
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    sys.modules['config'] = config
+
+import upbit_sell_signal_monitor_v2 as monitor
+
+
+def synthetic_state():
+    """코인 3개 스캔 결과 (KRW-CCC는 거래량 기준일 0 → volume_change = inf)"""
+    profiles = monitor.build_profiles()
+    markets = ['KRW-AAA', 'KRW-BBB', 'KRW-CCC']
+    matrix = np.zeros((len(markets), len(monitor.FEATURE_COLUMNS)))
+    for group in monitor.FEATURE_GROUPS:
+        matrix[:, monitor.FEATURE_INDEX[f"has_{group}"]] = 1.0
+    matrix[:, monitor.FEATURE_INDEX['quick_drop']] = [5.0, 1.0, 3.0]
+    matrix[0, monitor.FEATURE_INDEX['rsi']] = np.nan
+    matrix[2, monitor.FEATURE_INDEX['volume_change']] = np.inf
+    scores = np.array([[5.0, np.nan, 3.0]] * len(profiles))
+    passed = np.array([[True, False, True]] * len(profiles))
+    stages = np.array([[2, 0, 1]] * len(profiles))
+    state = monitor.new_daemon_state(profiles)
+    state.update(
+        markets=markets, matrix=matrix, scores=scores, passed=passed, stages=stages, scanned_at=monitor.get_kst_now()
+    )
+    return state
+
+
+class QueryServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = monitor.start_query_server(port=0)
+        cls.base = f"http://{monitor.QUERY_SERVER_HOST}:{cls.server.server_address[1]}"
+        cls.state = synthetic_state()
+        monitor.publish_query_results(cls.state)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.state['pool'] is not None:
+            cls.state['pool'].shutdown()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get(self, path):
+        """(상태 코드, JSON)"""
+        try:
+            with urllib.request.urlopen(self.base + path, timeout=5) as response:
+                return response.status, json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read().decode('utf-8'))
+
+    def test_index(self):
+        status, body = self.get("/")
+        self.assertEqual(status, 200)
+        self.assertEqual(body['markets'], 3)
+        self.assertEqual(body['profiles'], [profile['name'] for profile in self.state['profiles']])
+        self.assertIsNotNone(body['scanned_at'])
+
+    def test_top(self):
+        status, body = self.get("/top")
+        self.assertEqual(status, 200)
+        self.assertEqual(body['profile'], monitor.DEFAULT_PROFILE_NAME)
+        # 점수 없는 코인(NaN)은 제외, 점수 높은 순
+        self.assertEqual([item['market'] for item in body['top']], ['KRW-AAA', 'KRW-CCC'])
+        self.assertEqual(body['top'][0]['score'], 5)
+        self.assertEqual(body['top'][0]['stage'], monitor.SELL_STAGES[2]['stage'])
+        self.assertTrue(body['top'][0]['passed_filter'])
+
+    def test_top_profile(self):
+        name = monitor.DEFAULT_PROFILE_NAME
+        status, body = self.get(urllib.request.quote(f"/top/{name}"))
+        self.assertEqual(status, 200)
+        self.assertEqual(body, self.get("/top")[1])
+
+    def test_market(self):
+        status, body = self.get("/markets/KRW-AAA")
+        self.assertEqual(status, 200)
+        self.assertEqual(body['market'], 'KRW-AAA')
+        self.assertEqual(body['features']['quick_drop'], 5.0)
+        self.assertIsNone(body['features']['rsi'])
+        self.assertEqual(body['profiles'][monitor.DEFAULT_PROFILE_NAME]['score'], 5)
+
+    def test_market_non_finite_feature(self):
+        status, body = self.get("/markets/KRW-CCC")
+        self.assertEqual(status, 200)
+        self.assertIsNone(body['features']['volume_change'])
+
+    def test_unknown_path(self):
+        status, body = self.get("/markets/KRW-NOPE")
+        self.assertEqual(status, 404)
+        self.assertIn('error', body)
+
+    def test_failed_publish_keeps_last_responses(self):
+        broken = dict(self.state, matrix=None)
+        monitor.publish_query_results(broken)
+        status, body = self.get("/markets/KRW-AAA")
+        self.assertEqual(status, 200)
+        self.assertEqual(body['features']['quick_drop'], 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
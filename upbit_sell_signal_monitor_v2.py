@@ -13,17 +13,64 @@ import pandas as pd
 import numpy as np
 import requests
 import time
+import json
+import math
+import numbers
+import os
+import string
+import argparse
+import threading
+import runpy
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+from multiprocessing import shared_memory
 from datetime import datetime, timedelta
 import pytz
 import ta
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment
+import upbit_shared_cache as shared_cache
 import warnings
 warnings.filterwarnings('ignore')
 
 # 한국 시간대 설정
 KST = pytz.timezone('Asia/Seoul')
 
+# 신규 설정 기본값 (config.py에 없으면 아래 값 사용)
+DEADLINE_VALUE_WEIGHT = 1.0  # 우선순위 계산 시 거래대금 가중치
+DEADLINE_RESERVE_RATIO = 0.2  # 제한 시간 중 캔들 수집 후 단계(호가/계산/발송/저장)에 남겨둘 비율
+UNCOVERED_FILE = "upbit_sell_uncovered.json"  # 시간 초과로 분석하지 못한 코인 기록
+COMPUTE_WORKERS = 0  # 피처 계산 프로세스 수 (0 = CPU 코어 수)
+PARALLEL_MIN_MARKETS = 300  # 이 개수 미만이면 현재 프로세스에서 계산
+SNAPSHOT_ENABLED = True  # 스캔마다 전체 코인 피처 스냅샷 저장
+SNAPSHOT_DIR = "snapshots"  # 스냅샷 폴더 (날짜별 하위 폴더)
+UPBIT_RATE_LIMIT = 8  # 업비트 초당 최대 요청 수 (전체 공유)
+BOOTSTRAP_WORKERS = 4  # 페이지 병렬 요청 스레드 수
+CANDLE_CACHE_DIR = "candle_cache"  # 과거 캔들 캐시 폴더
+PROFILES = {}  # 추가 알림 프로필 {이름: {설정키: 값}} (기본 프로필은 config.py 값)
+SIGNAL_RULES = None  # 매도 신호 규칙 목록 (None = 기본 10개 지표)
+NEGATIVE_CACHE_FILE = "upbit_sell_negative_cache.json"  # 데이터 부족/실패 코인 격리 기록
+NEGATIVE_CACHE_BASE_MINUTES = 30  # 첫 실패 후 격리 시간 (실패할 때마다 2배)
+NEGATIVE_CACHE_MAX_MINUTES = 1440  # 최대 격리 시간 (24시간)
+DAEMON_INTERVAL = 600  # 데몬 모드 스캔 간격(초)
+CONFIG_WATCH_SECONDS = 5  # 데몬 모드 config.py 변경 확인 간격(초)
+SHARED_CACHE_ENABLED = False  # 같은 서버의 다른 모니터와 캔들/호가창 공유
+SHARED_CACHE_DIR = None  # 공유 캐시 폴더 (None = /dev/shm/upbit_cache)
+SHARED_CACHE_MAX_TTL = 600  # 캔들 항목 최대 유지 시간(초, 진행 중인 봉이 끝나면 만료)
+SHARED_CACHE_ORDERBOOK_TTL = 5  # 호가창 항목 유지 시간(초)
+QUERY_SERVER_PORT = 0  # 데몬 모드 조회용 HTTP 포트 (0 = 사용 안 함)
+QUERY_SERVER_HOST = "127.0.0.1"  # 조회용 HTTP 주소 (기본: 이 서버에서만 접속)
+QUERY_TOP_N = 20  # /top 응답 코인 수
+BREADTH_DROP_1H = 3.0  # 시장 지표: 1시간 이 % 이상 하락한 코인 비율 집계
+BREADTH_ALERT_THRESHOLD = 0  # 하락 코인 비율(%)이 이 값 이상이면 개별 알림 대신 시장 전체 알림 1건 (0 = 사용 안 함)
+LATENCY_FILE = "upbit_sell_latency.json"  # 알림별 감지 지연 기록 (최근 LATENCY_WINDOW건)
+LATENCY_WINDOW = 1000  # 감지 지연 통계에 쓰는 최근 알림 수
+
+# 데몬 모드에서 config.py에서 빠진 설정을 되돌릴 기본값
+_DEFAULT_SETTINGS = {key: value for key, value in globals().items() if key.isupper()}
+
 # 설정 파일 불러오기
 try:
     from config import *
@@ -32,6 +79,9 @@ except ImportError:
     print("📝 config.example.py를 config.py로 복사하고 설정을 입력하세요.")
     exit(1)
 
+# config.py에서 읽은 설정 (기본값이 없으면 데몬 재적용 시 필수)
+_CONFIG_KEYS = {key for key in vars(sys.modules['config']) if key.isupper()}
+
 # ============================================
 # 시간 관련 함수
 # ============================================
@@ -50,23 +100,86 @@ def format_kst_time(dt=None):
 # 텔레그램 전송 함수
 # ============================================
 
-def send_telegram(message, parse_mode=None):
-    """텔레그램 메시지 전송"""
+# 텔레그램/업비트 REST 요청이 공유하는 연결 (데몬 모드에서 매번 새로 연결하지 않음)
+_http = requests.Session()
+
+def send_telegram(message, parse_mode=None, chat_id=None):
+    """텔레그램 메시지 전송 (chat_id 생략 시 config.py의 CHAT_ID)"""
     try:
         url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
         data = {
-            "chat_id": CHAT_ID,
+            "chat_id": chat_id or CHAT_ID,
             "text": message
         }
         if parse_mode:
             data["parse_mode"] = parse_mode
             
-        response = requests.post(url, data=data, timeout=10)
+        response = _http.post(url, data=data, timeout=10)
         return response.json()
     except Exception as e:
         print(f"텔레그램 전송 실패: {e}")
         return None
 
+# ============================================
+# 티커 스냅샷 (우선순위 추정용)
+# ============================================
+
+def fetch_ticker_snapshot(tickers):
+    """
+    현재가 API를 100개씩 묶어 호출하여 24시간 변동률/거래대금 수집
+    - 코인당 1회씩 호출하지 않으므로 스캔 전에 가볍게 실행 가능
+    """
+    snapshot = {}
+    for i in range(0, len(tickers), 100):
+        chunk = tickers[i:i + 100]
+        try:
+            wait_rate_limit()
+            response = _http.get(
+                "https://api.upbit.com/v1/ticker",
+                params={"markets": ",".join(chunk)},
+                timeout=10
+            )
+            for item in response.json():
+                snapshot[item['market']] = {
+                    'change_rate_24h': item.get('signed_change_rate', 0) * 100,
+                    'trade_value_24h': item.get('acc_trade_price_24h', 0)
+                }
+        except Exception as e:
+            print(f"티커 스냅샷 조회 오류: {e}")
+        time.sleep(0.1)
+    return snapshot
+
+def prioritize_markets(tickers, snapshot):
+    """
+    급락폭 + 거래대금 기준으로 분석 순서 정렬
+    - 우선순위 = 24시간 하락률(%) + 가중치 × log10(24시간 거래대금)
+    - 스냅샷에 없는 코인은 맨 뒤 (원래 순서 유지)
+    """
+    def priority(coin):
+        item = snapshot.get(coin)
+        if item is None:
+            return float('-inf')
+        drop_24h = max(-item['change_rate_24h'], 0)
+        return drop_24h + DEADLINE_VALUE_WEIGHT * math.log10(1 + item['trade_value_24h'])
+    
+    return sorted(tickers, key=priority, reverse=True)
+
+def save_uncovered_markets(uncovered, deadline, total):
+    """시간 초과로 분석하지 못한 코인 목록 저장"""
+    try:
+        record = {
+            'time': format_kst_time(),
+            'deadline_seconds': deadline,
+            'total': total,
+            'covered': total - len(uncovered),
+            'uncovered': uncovered
+        }
+        with open(UNCOVERED_FILE, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        print(f"📝 미분석 코인 {len(uncovered)}개 기록: {UNCOVERED_FILE}")
+    except Exception as e:
+        print(f"미분석 코인 기록 오류: {e}")
+
 # ============================================
 # 급등 후 하락 패턴 분석 (개선)
 # ============================================
@@ -94,71 +207,82 @@ def analyze_price_pattern(coin):
         if df_day is None or len(df_day) < 20:
             return None
         
-        current_price = df_10m['close'].iloc[-1]
-        
-        # ===== 1. 단기 급락 감지 (10분봉) =====
-        # 최근 N개 봉 중 최고가 (Config에서 조정 가능)
-        recent_candles = df_10m.tail(QUICK_DROP_LOOKBACK)
-        recent_high = recent_candles['high'].max()
-        quick_drop = ((recent_high - current_price) / recent_high) * 100
-        
-        # 급락 발생 시점 (몇 개 봉 전?)
-        high_idx = recent_candles['high'].idxmax()
-        candles_since_high = len(recent_candles) - recent_candles.index.get_loc(high_idx) - 1
-        minutes_since_high = candles_since_high * 10
-        
-        # ===== 2. 중기 추세 (60분봉) =====
-        # 최근 12시간 최고가
-        high_12h = df_60m['high'].max()
-        drop_from_high_12h = ((high_12h - current_price) / high_12h) * 100
-        
-        # 최근 6시간 상승률
-        if len(df_60m) >= 7:
-            price_6h_ago = df_60m['close'].iloc[-7]
-            surge_6h = ((current_price - price_6h_ago) / price_6h_ago) * 100
-        else:
-            surge_6h = 0
-        
-        # 최근 1시간 변화율
-        price_1h_ago = df_60m['close'].iloc[-2]
-        change_1h = ((current_price - price_1h_ago) / price_1h_ago) * 100
+        return compute_price_pattern(df_10m, df_60m, df_day)
+    except Exception as e:
+        print(f"가격 패턴 분석 오류: {e}")
+        return None
+
+def compute_price_pattern(df_10m, df_60m, df_day):
+    """이미 받아온 캔들로 가격 패턴 계산 (API 호출 없음)"""
+    if df_10m is None or len(df_10m) < 30:
+        return None
+    if df_60m is None or len(df_60m) < 12:
+        return None
+    if df_day is None or len(df_day) < 20:
+        return None
+    
+    current_price = df_10m['close'].iloc[-1]
+    
+    # ===== 1. 단기 급락 감지 (10분봉) =====
+    # 최근 N개 봉 중 최고가 (Config에서 조정 가능)
+    recent_candles = df_10m.tail(QUICK_DROP_LOOKBACK)
+    recent_high = recent_candles['high'].max()
+    quick_drop = ((recent_high - current_price) / recent_high) * 100
+    
+    # 급락 발생 시점 (몇 개 봉 전?)
+    high_idx = recent_candles['high'].idxmax()
+    candles_since_high = len(recent_candles) - recent_candles.index.get_loc(high_idx) - 1
+    minutes_since_high = candles_since_high * 10
+    
+    # ===== 2. 중기 추세 (60분봉) =====
+    # 최근 12시간 최고가
+    high_12h = df_60m['high'].max()
+    drop_from_high_12h = ((high_12h - current_price) / high_12h) * 100
+    
+    # 최근 6시간 상승률
+    if len(df_60m) >= 7:
+        price_6h_ago = df_60m['close'].iloc[-7]
+        surge_6h = ((current_price - price_6h_ago) / price_6h_ago) * 100
+    else:
+        surge_6h = 0
+    
+    # 최근 1시간 변화율
+    price_1h_ago = df_60m['close'].iloc[-2]
+    change_1h = ((current_price - price_1h_ago) / price_1h_ago) * 100
+    
+    # ===== 3. 장기 추세 (일봉) =====
+    price_7d_ago = df_day['close'].iloc[-8] if len(df_day) >= 8 else df_day['close'].iloc[0]
+    change_7d = ((current_price - price_7d_ago) / price_7d_ago) * 100
+    
+    # ===== 4. 변동성 체크 (10분봉 기준) =====
+    # 최근 N개 봉의 평균 변동률
+    recent_volatility = []
+    for i in range(1, min(VOLATILITY_CHECK_CANDLES + 1, len(df_10m))):
+        change = abs((df_10m['close'].iloc[-i] - df_10m['close'].iloc[-(i+1)]) / df_10m['close'].iloc[-(i+1)]) * 100
+        recent_volatility.append(change)
+    
+    avg_volatility = np.mean(recent_volatility) if recent_volatility else 0
+    
+    return {
+        'current_price': current_price,
         
-        # ===== 3. 장기 추세 (일봉) =====
-        price_7d_ago = df_day['close'].iloc[-8] if len(df_day) >= 8 else df_day['close'].iloc[0]
-        change_7d = ((current_price - price_7d_ago) / price_7d_ago) * 100
+        # 단기 (10분봉)
+        'quick_drop': quick_drop,  # 최근 N개 봉 중 최고가 대비 하락
+        'minutes_since_high': minutes_since_high,  # 고점 이후 경과 시간
+        'recent_high': recent_high,
         
-        # ===== 4. 변동성 체크 (10분봉 기준) =====
-        # 최근 N개 봉의 평균 변동률
-        recent_volatility = []
-        for i in range(1, min(VOLATILITY_CHECK_CANDLES + 1, len(df_10m))):
-            change = abs((df_10m['close'].iloc[-i] - df_10m['close'].iloc[-(i+1)]) / df_10m['close'].iloc[-(i+1)]) * 100
-            recent_volatility.append(change)
+        # 중기 (60분봉)
+        'high_12h': high_12h,
+        'drop_from_high_12h': drop_from_high_12h,
+        'surge_6h': surge_6h,
+        'change_1h': change_1h,
         
-        avg_volatility = np.mean(recent_volatility) if recent_volatility else 0
+        # 장기 (일봉)
+        'change_7d': change_7d,
         
-        return {
-            'current_price': current_price,
-            
-            # 단기 (10분봉)
-            'quick_drop': quick_drop,  # 최근 N개 봉 중 최고가 대비 하락
-            'minutes_since_high': minutes_since_high,  # 고점 이후 경과 시간
-            'recent_high': recent_high,
-            
-            # 중기 (60분봉)
-            'high_12h': high_12h,
-            'drop_from_high_12h': drop_from_high_12h,
-            'surge_6h': surge_6h,
-            'change_1h': change_1h,
-            
-            # 장기 (일봉)
-            'change_7d': change_7d,
-            
-            # 변동성
-            'avg_volatility': avg_volatility
-        }
-    except Exception as e:
-        print(f"가격 패턴 분석 오류: {e}")
-        return None
+        # 변동성
+        'avg_volatility': avg_volatility
+    }
 
 # ============================================
 # 거래량 분석 (하락 전환)
@@ -169,46 +293,50 @@ def analyze_volume_decline(coin):
     try:
         # 일봉 데이터
         df = pyupbit.get_ohlcv(coin, interval="day", count=30)
-        if df is None or len(df) < 20:
-            return None
-        
-        current_volume = df['volume'].iloc[-1]
-        volume_ma_20 = df['volume'].rolling(20).mean().iloc[-1]
-        
-        # 1. 거래량 MA 대비
-        volume_ratio = current_volume / volume_ma_20
-        
-        # 2. 거래량 감소 추세 (최근 N일)
-        volume_trend = []
-        for i in range(1, VOLUME_DECLINE_DAYS + 1):
-            if len(df) > i:
-                volume_trend.append(df['volume'].iloc[-i])
-        
-        volume_declining = all(volume_trend[i] < volume_trend[i-1] for i in range(1, len(volume_trend))) if len(volume_trend) > 1 else False
-        
-        # 3. 가격-거래량 다이버전스
-        lookback = DIVERGENCE_LOOKBACK_DAYS
-        if len(df) > lookback:
-            price_change = ((df['close'].iloc[-1] - df['close'].iloc[-(lookback+1)]) / df['close'].iloc[-(lookback+1)]) * 100
-            volume_change = ((current_volume - df['volume'].iloc[-(lookback+1)]) / df['volume'].iloc[-(lookback+1)]) * 100
-        else:
-            price_change = 0
-            volume_change = 0
-        
-        # 가격은 상승했지만 거래량이 감소 = 약세 다이버전스
-        divergence_signal = (price_change > DIVERGENCE_PRICE_THRESHOLD) and (volume_change < DIVERGENCE_VOLUME_THRESHOLD)
-        
-        return {
-            'volume_ratio': volume_ratio,
-            'volume_declining': volume_declining,
-            'divergence_signal': divergence_signal,
-            'price_change': price_change,
-            'volume_change': volume_change
-        }
+        return compute_volume_decline(df)
     except Exception as e:
         print(f"거래량 분석 오류: {e}")
         return None
 
+def compute_volume_decline(df):
+    """이미 받아온 일봉으로 거래량 분석 (API 호출 없음)"""
+    if df is None or len(df) < 20:
+        return None
+    
+    current_volume = df['volume'].iloc[-1]
+    volume_ma_20 = df['volume'].rolling(20).mean().iloc[-1]
+    
+    # 1. 거래량 MA 대비
+    volume_ratio = current_volume / volume_ma_20
+    
+    # 2. 거래량 감소 추세 (최근 N일)
+    volume_trend = []
+    for i in range(1, VOLUME_DECLINE_DAYS + 1):
+        if len(df) > i:
+            volume_trend.append(df['volume'].iloc[-i])
+    
+    volume_declining = all(volume_trend[i] < volume_trend[i-1] for i in range(1, len(volume_trend))) if len(volume_trend) > 1 else False
+    
+    # 3. 가격-거래량 다이버전스
+    lookback = DIVERGENCE_LOOKBACK_DAYS
+    if len(df) > lookback:
+        price_change = ((df['close'].iloc[-1] - df['close'].iloc[-(lookback+1)]) / df['close'].iloc[-(lookback+1)]) * 100
+        volume_change = ((current_volume - df['volume'].iloc[-(lookback+1)]) / df['volume'].iloc[-(lookback+1)]) * 100
+    else:
+        price_change = 0
+        volume_change = 0
+    
+    # 가격은 상승했지만 거래량이 감소 = 약세 다이버전스
+    divergence_signal = (price_change > DIVERGENCE_PRICE_THRESHOLD) and (volume_change < DIVERGENCE_VOLUME_THRESHOLD)
+    
+    return {
+        'volume_ratio': volume_ratio,
+        'volume_declining': volume_declining,
+        'divergence_signal': divergence_signal,
+        'price_change': price_change,
+        'volume_change': volume_change
+    }
+
 # ============================================
 # 호가창 분석 (매도 우세)
 # ============================================
@@ -220,34 +348,36 @@ def analyze_orderbook_sell(coin):
         if orderbook is None or not isinstance(orderbook, list) or len(orderbook) == 0:
             return None
         
-        orderbook_data = orderbook[0]
-        
-        if 'orderbook_units' not in orderbook_data:
-            return None
-        
-        units = orderbook_data['orderbook_units']
-        
-        # 매수/매도 총 물량
-        total_bid_size = sum([item.get('bid_size', 0) for item in units])
-        total_ask_size = sum([item.get('ask_size', 0) for item in units])
-        
-        # 매도/매수 비율 (매도가 크면 높음)
-        ask_bid_ratio = total_ask_size / total_bid_size if total_bid_size > 0 else 0
-        
-        # 최상단 매도 물량
-        top_bid = units[0].get('bid_size', 0) if len(units) > 0 else 0
-        top_ask = units[0].get('ask_size', 0) if len(units) > 0 else 0
-        
-        return {
-            'total_bid': total_bid_size,
-            'total_ask': total_ask_size,
-            'ask_bid_ratio': ask_bid_ratio,
-            'top_bid': top_bid,
-            'top_ask': top_ask
-        }
+        return compute_orderbook_sell(orderbook[0])
     except Exception as e:
         return None
 
+def compute_orderbook_sell(orderbook_data):
+    """이미 받아온 호가창(코인 1개분)으로 매도 압력 계산"""
+    if not orderbook_data or 'orderbook_units' not in orderbook_data:
+        return None
+    
+    units = orderbook_data['orderbook_units']
+    
+    # 매수/매도 총 물량
+    total_bid_size = sum([item.get('bid_size', 0) for item in units])
+    total_ask_size = sum([item.get('ask_size', 0) for item in units])
+    
+    # 매도/매수 비율 (매도가 크면 높음)
+    ask_bid_ratio = total_ask_size / total_bid_size if total_bid_size > 0 else 0
+    
+    # 최상단 매도 물량
+    top_bid = units[0].get('bid_size', 0) if len(units) > 0 else 0
+    top_ask = units[0].get('ask_size', 0) if len(units) > 0 else 0
+    
+    return {
+        'total_bid': total_bid_size,
+        'total_ask': total_ask_size,
+        'ask_bid_ratio': ask_bid_ratio,
+        'top_bid': top_bid,
+        'top_ask': top_ask
+    }
+
 # ============================================
 # 기술적 지표 (매도 신호)
 # ============================================
@@ -256,170 +386,1222 @@ def calculate_sell_indicators(coin):
     """매도 관련 기술적 지표"""
     try:
         df = pyupbit.get_ohlcv(coin, interval="day", count=100)
-        if df is None or len(df) < 50:
-            return None
+        return compute_sell_indicators(df)
+    except Exception as e:
+        return None
+
+def compute_sell_indicators(df):
+    """이미 받아온 일봉(100개)으로 기술적 지표 계산"""
+    if df is None or len(df) < 50:
+        return None
+    
+    # 1. RSI (과매수)
+    rsi = ta.momentum.RSIIndicator(df['close'], window=14).rsi().iloc[-1]
+    rsi_signal = "과매수" if rsi > RSI_OVERBOUGHT else "고점권" if rsi > RSI_HIGH else "중립"
+    
+    # 2. MACD (데드크로스)
+    macd = ta.trend.MACD(df['close'])
+    macd_line = macd.macd().iloc[-1]
+    signal_line = macd.macd_signal().iloc[-1]
+    macd_hist = macd.macd_diff().iloc[-1]
+    macd_signal = "데드크로스" if macd_line < signal_line and macd_hist < 0 else "약세전환" if macd_line < signal_line else "중립"
+    
+    # 3. 볼린저 밴드 (상단 이탈)
+    bollinger = ta.volatility.BollingerBands(df['close'])
+    bb_high = bollinger.bollinger_hband().iloc[-1]
+    bb_low = bollinger.bollinger_lband().iloc[-1]
+    current_price = df['close'].iloc[-1]
+    
+    # 상단 터치 후 하락 확인
+    price_pct = (current_price - bb_low) / (bb_high - bb_low) * 100
+    
+    if current_price >= bb_high:
+        bb_signal = "상단이탈"
+    elif price_pct > BB_HIGH_THRESHOLD:
+        bb_signal = "상단근접"
+    else:
+        bb_signal = "중립"
+    
+    # 4. 이동평균선 (하향 전환)
+    ma5 = df['close'].rolling(5).mean().iloc[-1]
+    ma20 = df['close'].rolling(20).mean().iloc[-1]
+    ma_signal = "하향돌파" if ma5 < ma20 else "하향접근" if current_price < ma5 else "중립"
+    
+    # 5. 스토캐스틱 (과매수)
+    stoch = ta.momentum.StochasticOscillator(df['high'], df['low'], df['close'])
+    stoch_k = stoch.stoch().iloc[-1]
+    stoch_signal = "과매수" if stoch_k > STOCH_OVERBOUGHT else "고점권" if stoch_k > STOCH_HIGH else "중립"
+    
+    return {
+        'rsi': rsi,
+        'rsi_signal': rsi_signal,
+        'macd_signal': macd_signal,
+        'bb_signal': bb_signal,
+        'bb_position': price_pct,
+        'ma_signal': ma_signal,
+        'stoch': stoch_k,
+        'stoch_signal': stoch_signal,
+        'current_price': current_price
+    }
+
+# ============================================
+# 업비트 요청 속도 제한 + 캔들 캐시
+# ============================================
+
+# 타임프레임별 캔들 간격(분)
+INTERVAL_MINUTES = {
+    'minute1': 1, 'minute3': 3, 'minute5': 5, 'minute10': 10, 'minute15': 15,
+    'minute30': 30, 'minute60': 60, 'minute240': 240, 'day': 1440,
+}
+
+# 업비트 캔들 API 1회 최대 개수
+CANDLE_PAGE_SIZE = 200
+
+# 캔들 API 응답 필드 → 컬럼 (pyupbit.get_ohlcv와 같은 컬럼)
+CANDLE_API_FIELDS = {
+    'opening_price': 'open', 'high_price': 'high', 'low_price': 'low', 'trade_price': 'close',
+    'candle_acc_trade_volume': 'volume', 'candle_acc_trade_price': 'value',
+}
+
+_rate_lock = threading.Lock()
+_rate_next_slot = 0.0
+
+def wait_rate_limit():
+    """모든 업비트 요청이 공유하는 초당 요청 수 제한 (스레드 안전)"""
+    global _rate_next_slot
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _rate_next_slot)
+        _rate_next_slot = slot + 1.0 / UPBIT_RATE_LIMIT
+    if slot > now:
+        time.sleep(slot - now)
+
+def _candle_step(interval):
+    """캔들 간격 (Timedelta)"""
+    return pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+
+def _floor_to_grid(ts, span):
+    """KST(naive) 시각을 UTC 기준 span 격자로 내림 (일봉 경계 = KST 09:00)"""
+    utc_offset = pd.Timedelta(hours=9)
+    epoch = pd.Timestamp('1970-01-01')
+    return epoch + ((ts - utc_offset - epoch) // span) * span + utc_offset
+
+def _page_grid(interval, start, end):
+    """
+    [start, end) 구간을 200개 단위 페이지로 분할 → [(page_start, page_end), ...]
+    - 시각은 KST(naive), 페이지 경계는 UTC 기준 고정 격자
+      → 매번 같은 경계가 나와서 지난 페이지는 캐시 재사용 가능
+    """
+    span = _candle_step(interval) * CANDLE_PAGE_SIZE
+    first = _floor_to_grid(start, span)
+    pages = []
+    page_start = first
+    while page_start < end:
+        pages.append((page_start, page_start + span))
+        page_start += span
+    return pages
+
+def _page_path(coin, interval, page_start):
+    """페이지 캐시 파일 경로"""
+    return os.path.join(CANDLE_CACHE_DIR, interval, coin, f"{page_start.strftime('%Y%m%dT%H%M')}.csv")
+
+def request_candles(coin, interval, count, to=None):
+    """
+    캔들 API 직접 요청 (속도 제한 적용)
+    - pyupbit.get_ohlcv는 캔들이 없는 구간(상장 전)도 None을 돌려줘서 요청 실패와 구분되지 않음
+    - 반환: DataFrame (캔들이 없으면 빈 DataFrame), 요청 실패 시 None
+    """
+    params = {'market': coin, 'count': count}
+    if to:
+        params['to'] = to
+    try:
+        wait_rate_limit()
+        response = _http.get(pyupbit.get_url_ohlcv(interval), params=params, timeout=10)
+        response.raise_for_status()
+        contents = response.json()
+    except Exception:
+        return None
+    if not isinstance(contents, list):
+        return None
+    
+    index = pd.DatetimeIndex([pd.Timestamp(item['candle_date_time_kst']) for item in contents])
+    df = pd.DataFrame(
+        {column: [item[field] for item in contents] for field, column in CANDLE_API_FIELDS.items()},
+        index=index, dtype=float
+    )
+    return df.sort_index()
+
+def _fetch_page(coin, interval, page_start, page_end, retries=3):
+    """
+    페이지 1개 요청 (속도 제한 적용, 실패 시 재시도)
+    - 업비트 to 파라미터는 UTC, 결과 인덱스는 KST
+    - 거래 없는 구간이 있으면 이전 캔들까지 오므로 [page_start, page_end)만 남김
+    - 상장 전 페이지는 빈 DataFrame (요청 실패가 아니므로 재시도하지 않음)
+    """
+    to = (page_end - pd.Timedelta(hours=9)).strftime('%Y-%m-%d %H:%M:%S')
+    for attempt in range(retries):
+        df = request_candles(coin, interval, CANDLE_PAGE_SIZE, to=to)
+        if df is not None:
+            return df[(df.index >= page_start) & (df.index < page_end)]
+        time.sleep(0.5 * (attempt + 1))
+    raise RuntimeError(f"{coin} {interval} {page_start} 페이지 요청 실패")
+
+def _write_page(path, df):
+    """완료된 페이지를 캐시에 기록 (임시 파일 → 이름 변경으로 원자적 저장)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path)
+    os.replace(tmp_path, path)
+
+def _read_page(path):
+    """캐시 페이지 읽기"""
+    return pd.read_csv(path, index_col=0, parse_dates=[0])
+
+def fetch_candle_range(coin, interval, start, end, workers=None):
+    """
+    [start, end) 구간 캔들을 페이지 단위로 병렬 수집
+    - 캐시에 있는 페이지는 재사용, 없는 페이지만 요청 (중단 후 재실행 시 이어서 진행)
+    - 이미 끝난 페이지만 캐시에 기록 (진행 중인 최신 페이지는 매번 새로 요청)
+    - 상장 전 페이지는 빈 페이지로 기록 → 상장 이후 캔들만 반환 (전부 상장 전이면 빈 DataFrame)
+    """
+    workers = workers or BOOTSTRAP_WORKERS
+    now = pd.Timestamp(get_kst_now().replace(tzinfo=None))
+    pages = _page_grid(interval, start, end)
+    
+    def load(page):
+        page_start, page_end = page
+        path = _page_path(coin, interval, page_start)
+        if os.path.exists(path):
+            return _read_page(path)
+        df = _fetch_page(coin, interval, page_start, page_end)
+        if page_end <= now:
+            _write_page(path, df)
+        return df
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(load, pages))
+    
+    filled = [df for df in frames if len(df)]
+    if not filled:
+        return frames[0].iloc[:0] if frames else None
+    df = pd.concat(filled).sort_index()
+    return df[(df.index >= start) & (df.index < end)]
+
+def get_candles(coin, interval, count):
+    """
+    최근 캔들 count개 (pyupbit.get_ohlcv 대체)
+    - 200개 이하: 요청 1회
+    - 200개 초과: 페이지 병렬 요청 + 지난 페이지는 캐시 재사용
+    - 상장한 지 얼마 안 된 코인은 count개보다 짧게 반환, 요청 실패 시 None
+    """
+    if count <= CANDLE_PAGE_SIZE:
+        return request_candles(coin, interval, count)
+    
+    step = _candle_step(interval)
+    now = pd.Timestamp(get_kst_now().replace(tzinfo=None))
+    # 진행 중인 캔들까지 포함 (pyupbit와 동일)
+    end = _floor_to_grid(now, step) + step
+    df = fetch_candle_range(coin, interval, end - step * count, end)
+    return df.tail(count) if df is not None else None
+
+def update_candles(coin, interval, count, cached=None):
+    """
+    최근 캔들 count개 (데몬 모드: 지난 스캔 캔들에 새 캔들만 이어붙임)
+    - 지난 스캔의 마지막 캔들(진행 중이던 봉)부터 다시 받아서 덮어씀
+    - 캐시가 없거나 짧으면/너무 오래됐으면 get_candles로 전부 다시 수집
+    """
+    if cached is None or len(cached) < count:
+        return get_candles(coin, interval, count)
+    
+    now = pd.Timestamp(get_kst_now().replace(tzinfo=None))
+    missing = max(int((now - cached.index[-1]) // _candle_step(interval)), 0) + 1
+    if missing >= CANDLE_PAGE_SIZE:
+        return get_candles(coin, interval, count)
+    
+    recent = request_candles(coin, interval, missing)
+    if recent is None or len(recent) == 0:
+        return None
+    return pd.concat([cached[cached.index < recent.index[0]], recent]).tail(count)
+
+def verify_candles(df, interval, start, end):
+    """
+    수집 결과 검증: 중복 시각, 빠진 캔들 (거래 없는 구간도 빠진 캔들로 집계)
+    - 기대 시각은 캔들 격자 기준 (start를 다음 캔들 시작으로 올림, 일봉은 KST 09:00)
+    """
+    step = _candle_step(interval)
+    first = _floor_to_grid(start - pd.Timedelta(1, 'ns'), step) + step
+    expected = pd.date_range(first, end, freq=step, inclusive='left') if end > first else pd.DatetimeIndex([])
+    index = df.index if df is not None else pd.DatetimeIndex([])
+    return {
+        'count': len(index),
+        'expected': len(expected),
+        'duplicates': int(index.duplicated().sum()),
+        'missing': [format_kst_time(ts) for ts in expected.difference(index)],
+    }
+
+def bootstrap_history(markets, interval, start, end):
+    """
+    과거 캔들 부트스트랩 (백테스트 저장소/긴 MINUTE_10_COUNT용)
+    - 코인별 [start, end) 구간을 200개 페이지로 나눠 병렬 수집 → 캐시에 바로 기록
+    - 중단되면 같은 명령을 다시 실행: 완료된 페이지는 건너뜀
+    """
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end)
+    pages = len(_page_grid(interval, start, end))
+    print(f"📥 부트스트랩: {len(markets)}개 코인 × {pages}페이지 ({interval}, {start} ~ {end})")
+    
+    report = {}
+    for idx, coin in enumerate(markets, 1):
+        try:
+            df = fetch_candle_range(coin, interval, start, end)
+            result = verify_candles(df, interval, start, end)
+        except Exception as e:
+            result = {'error': str(e)}
+        report[coin] = result
         
-        # 1. RSI (과매수)
-        rsi = ta.momentum.RSIIndicator(df['close'], window=14).rsi().iloc[-1]
-        rsi_signal = "과매수" if rsi > RSI_OVERBOUGHT else "고점권" if rsi > RSI_HIGH else "중립"
-        
-        # 2. MACD (데드크로스)
-        macd = ta.trend.MACD(df['close'])
-        macd_line = macd.macd().iloc[-1]
-        signal_line = macd.macd_signal().iloc[-1]
-        macd_hist = macd.macd_diff().iloc[-1]
-        macd_signal = "데드크로스" if macd_line < signal_line and macd_hist < 0 else "약세전환" if macd_line < signal_line else "중립"
-        
-        # 3. 볼린저 밴드 (상단 이탈)
-        bollinger = ta.volatility.BollingerBands(df['close'])
-        bb_high = bollinger.bollinger_hband().iloc[-1]
-        bb_low = bollinger.bollinger_lband().iloc[-1]
-        current_price = df['close'].iloc[-1]
-        
-        # 상단 터치 후 하락 확인
-        price_pct = (current_price - bb_low) / (bb_high - bb_low) * 100
-        
-        if current_price >= bb_high:
-            bb_signal = "상단이탈"
-        elif price_pct > BB_HIGH_THRESHOLD:
-            bb_signal = "상단근접"
+        if 'error' in result:
+            print(f"❌ [{idx}/{len(markets)}] {coin}: {result['error']} (재실행하면 이어서 진행)")
+        elif result['duplicates'] or result['missing']:
+            print(f"⚠️ [{idx}/{len(markets)}] {coin}: {result['count']}/{result['expected']}개, "
+                  f"중복 {result['duplicates']}, 빠짐 {len(result['missing'])}")
         else:
-            bb_signal = "중립"
-        
-        # 4. 이동평균선 (하향 전환)
-        ma5 = df['close'].rolling(5).mean().iloc[-1]
-        ma20 = df['close'].rolling(20).mean().iloc[-1]
-        ma_signal = "하향돌파" if ma5 < ma20 else "하향접근" if current_price < ma5 else "중립"
-        
-        # 5. 스토캐스틱 (과매수)
-        stoch = ta.momentum.StochasticOscillator(df['high'], df['low'], df['close'])
-        stoch_k = stoch.stoch().iloc[-1]
-        stoch_signal = "과매수" if stoch_k > STOCH_OVERBOUGHT else "고점권" if stoch_k > STOCH_HIGH else "중립"
-        
-        return {
-            'rsi': rsi,
-            'rsi_signal': rsi_signal,
-            'macd_signal': macd_signal,
-            'bb_signal': bb_signal,
-            'bb_position': price_pct,
-            'ma_signal': ma_signal,
-            'stoch': stoch_k,
-            'stoch_signal': stoch_signal,
-            'current_price': current_price
-        }
+            print(f"✅ [{idx}/{len(markets)}] {coin}: {result['count']}개 (빠짐/중복 없음)")
+    
+    report_file = os.path.join(CANDLE_CACHE_DIR, f"bootstrap_report_{interval}.json")
+    os.makedirs(CANDLE_CACHE_DIR, exist_ok=True)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📝 검증 결과 저장: {report_file}")
+    return report
+
+# ============================================
+# 데이터 수집 (스캔 1단계)
+# ============================================
+
+# 분석에 쓰는 타임프레임과 캔들 컬럼
+CANDLE_INTERVALS = ('minute10', 'minute60', 'day')
+CANDLE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# 가격 패턴 계산에 필요한 최소 캔들 수 (compute_price_pattern과 동일)
+MIN_CANDLES = {'minute10': 30, 'minute60': 12, 'day': 20}
+
+# 건너뛴 이유
+REASON_SHORT_HISTORY = "데이터 부족"
+REASON_FETCH_FAILED = "요청 실패"
+
+def _short_history(interval, df):
+    """데이터 부족 사유 + 필요한 개수가 쌓이는 예상 시각 (첫 캔들 + 필요 개수 × 간격, 캔들이 없으면 지금부터)"""
+    required = MIN_CANDLES[interval]
+    first = df.index[0] if len(df) else pd.Timestamp(get_kst_now().replace(tzinfo=None))
+    return {
+        'reason': REASON_SHORT_HISTORY,
+        'detail': f"{interval} {len(df)}/{required}개",
+        'ready_at': first + _candle_step(interval) * required,
+    }
+
+# 사용할 수 없는 공유 캐시 폴더 (경고는 폴더별 1번만 출력)
+_unsafe_cache_dirs = set()
+
+def use_shared_cache():
+    """공유 캐시 사용 여부 (설정 + OS 지원 + 캐시 폴더 소유자/권한 확인)"""
+    if not (SHARED_CACHE_ENABLED and shared_cache.is_supported()):
+        return False
+    cache_dir = shared_cache_dir()
+    try:
+        shared_cache.check_cache_dir(cache_dir)
+    except PermissionError as e:
+        if cache_dir not in _unsafe_cache_dirs:
+            _unsafe_cache_dirs.add(cache_dir)
+            print(f"⚠️ 공유 캐시 사용 안 함: {e}")
+        return False
+    return True
+
+def shared_cache_dir():
+    """공유 캐시 폴더"""
+    return SHARED_CACHE_DIR or shared_cache.default_cache_dir()
+
+def candle_ttl(interval):
+    """캔들 공유 캐시 유지 시간(초): 진행 중인 봉이 끝날 때까지 (최대 SHARED_CACHE_MAX_TTL)"""
+    step = _candle_step(interval)
+    now = pd.Timestamp(get_kst_now().replace(tzinfo=None))
+    bar_end = _floor_to_grid(now, step) + step
+    return min((bar_end - now).total_seconds(), SHARED_CACHE_MAX_TTL)
+
+def cached_candles(coin, interval, count, cached=None):
+    """
+    공유 캐시를 거친 캔들 조회 (다른 모니터가 같은 봉 안에 받아둔 캔들 재사용)
+    - 코인+타임프레임당 1개 항목 (DataFrame, 매수 모니터와 같은 형식): 요청 개수 이상이면 뒤에서 count개만 사용
+    - 없으면 update_candles로 받아서 공유 (동시에 요청한 프로세스는 1번만 요청)
+    - 상장한 지 얼마 안 된 코인은 count개보다 짧으므로 봉이 끝날 때까지 매번 새로 요청
+    """
+    if not use_shared_cache():
+        return update_candles(coin, interval, count, cached)
+    
+    df = shared_cache.get_or_fetch(
+        shared_cache_dir(), f"candles/{interval}/{coin}",
+        lambda: update_candles(coin, interval, count, cached), candle_ttl(interval),
+        accept=lambda df: isinstance(df, pd.DataFrame) and len(df) >= count
+    )
+    return df.tail(count) if df is not None else None
+
+def fetch_market_candles(coin, cached=None):
+    """
+    코인 1개의 분석용 캔들 수집 (10분봉, 60분봉, 일봉 100개)
+    - 일봉 100개 하나로 가격패턴(30일)/거래량(30일)/지표(100일) 모두 계산
+    - cached: 지난 스캔의 캔들 dict (데몬 모드, 새 캔들만 요청)
+    - 반환: (캔들 dict, None) 또는 (None, 건너뛴 이유 dict)
+    - 가격 패턴을 계산할 수 없으면 이후 캔들 요청 생략
+    """
+    cached = cached or {}
+    candles = {}
+    for interval, count in (('minute10', MINUTE_10_COUNT), ('minute60', MINUTE_60_COUNT), ('day', 100)):
+        df = cached_candles(coin, interval, count, cached.get(interval))
+        if df is None:
+            return None, {'reason': REASON_FETCH_FAILED, 'detail': f"{interval} 응답 없음"}
+        if len(df) < MIN_CANDLES[interval]:
+            return None, _short_history(interval, df)
+        candles[interval] = df
+    
+    return candles, None
+
+def _request_orderbooks(coins):
+    """호가창 원본을 50개씩 묶어서 조회 → {코인: 호가 데이터}"""
+    orderbooks = {}
+    for i in range(0, len(coins), 50):
+        chunk = coins[i:i + 50]
+        try:
+            wait_rate_limit()
+            items = pyupbit.get_orderbook(chunk)
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                orderbooks[item.get('market')] = item
+        except Exception as e:
+            print(f"호가창 조회 오류: {e}")
+        time.sleep(0.1)
+    return orderbooks
+
+def fetch_orderbooks(coins):
+    """호가창을 여러 코인씩 묶어서 조회 → {코인: 매도 압력 분석 결과} (공유 캐시 사용 시 캐시에 없는 코인만 요청)"""
+    if use_shared_cache():
+        orderbooks = shared_cache.get_many_or_fetch(
+            shared_cache_dir(), "orderbook", coins, _request_orderbooks, SHARED_CACHE_ORDERBOOK_TTL
+        )
+    else:
+        orderbooks = _request_orderbooks(coins)
+    return {coin: compute_orderbook_sell(item) for coin, item in orderbooks.items()}
+
+# ============================================
+# 네거티브 캐시 (데이터 부족/반복 실패 코인 격리)
+# ============================================
+
+def parse_kst_time(text):
+    """format_kst_time() 문자열 → KST datetime"""
+    return KST.localize(datetime.strptime(text, '%Y-%m-%d %H:%M:%S'))
+
+def load_negative_cache():
+    """네거티브 캐시 읽기 {코인: {reason, detail, failures, failed_at, retry_at}}"""
+    try:
+        with open(NEGATIVE_CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"네거티브 캐시 읽기 오류: {e}")
+        return {}
+
+def save_negative_cache(cache):
+    """네거티브 캐시 저장"""
+    try:
+        with open(NEGATIVE_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
     except Exception as e:
+        print(f"네거티브 캐시 저장 오류: {e}")
+
+def get_quarantine(cache, coin, now):
+    """격리 중이면 캐시 항목, 재시도 시각이 지났으면 None (자동 재진입)"""
+    entry = cache.get(coin)
+    if entry and now < parse_kst_time(entry['retry_at']):
+        return entry
+    return None
+
+def record_market_failure(cache, coin, problem, now):
+    """
+    실패 기록 + 재시도 시각 결정
+    - 요청 실패: NEGATIVE_CACHE_BASE_MINUTES부터 실패할 때마다 2배 (최대 NEGATIVE_CACHE_MAX_MINUTES)
+    - 데이터 부족(신규 상장): 필요한 캔들이 쌓이는 예상 시각에 재진입
+      (예상 시각이 이미 지났으면 거래가 뜸한 코인 → 요청 실패와 같은 백오프)
+    """
+    failures = cache.get(coin, {}).get('failures', 0) + 1
+    backoff = min(NEGATIVE_CACHE_BASE_MINUTES * 2 ** (failures - 1), NEGATIVE_CACHE_MAX_MINUTES)
+    retry_at = now + timedelta(minutes=backoff)
+    
+    ready_at = problem.get('ready_at')
+    if ready_at is not None:
+        ready_at = KST.localize(ready_at.to_pydatetime())
+        if ready_at > now:
+            retry_at = ready_at
+    
+    cache[coin] = {
+        'reason': problem['reason'],
+        'detail': problem['detail'],
+        'failures': failures,
+        'failed_at': format_kst_time(now),
+        'retry_at': format_kst_time(retry_at),
+    }
+
+def format_skipped_markets(skipped):
+    """스캔 요약용 건너뛴 코인 목록 (이유별)"""
+    lines = []
+    for reason in (REASON_SHORT_HISTORY, REASON_FETCH_FAILED):
+        items = [(coin, entry) for coin, entry in skipped if entry['reason'] == reason]
+        if not items:
+            continue
+        lines.append(f"🚫 {reason} {len(items)}개:")
+        for coin, entry in items:
+            lines.append(f"   └ {coin}: {entry['detail']} (실패 {entry['failures']}회, 재시도 {entry['retry_at']})")
+    return "\n".join(lines)
+
+# ============================================
+# 피처 벡터 (코인별 분석 결과를 숫자 배열로)
+# ============================================
+
+# 범주형 지표 라벨 (배열에는 인덱스로 저장)
+RSI_LABELS = ("중립", "고점권", "과매수")
+MACD_LABELS = ("중립", "약세전환", "데드크로스")
+BB_LABELS = ("중립", "상단근접", "상단이탈")
+MA_LABELS = ("중립", "하향접근", "하향돌파")
+STOCH_LABELS = ("중립", "고점권", "과매수")
+
+# (컬럼명, 그룹, 분석 결과 키, 타입) - 타입: None=실수, 'int', 'bool', 튜플=범주형 라벨
+FEATURE_SCHEMA = [
+    # analyze_price_pattern
+    ('current_price', 'pattern', 'current_price', None),
+    ('quick_drop', 'pattern', 'quick_drop', None),
+    ('minutes_since_high', 'pattern', 'minutes_since_high', 'int'),
+    ('recent_high', 'pattern', 'recent_high', None),
+    ('high_12h', 'pattern', 'high_12h', None),
+    ('drop_from_high_12h', 'pattern', 'drop_from_high_12h', None),
+    ('surge_6h', 'pattern', 'surge_6h', None),
+    ('change_1h', 'pattern', 'change_1h', None),
+    ('change_7d', 'pattern', 'change_7d', None),
+    ('avg_volatility', 'pattern', 'avg_volatility', None),
+    
+    # analyze_volume_decline
+    ('volume_ratio', 'volume', 'volume_ratio', None),
+    ('volume_declining', 'volume', 'volume_declining', 'bool'),
+    ('divergence_signal', 'volume', 'divergence_signal', 'bool'),
+    ('price_change', 'volume', 'price_change', None),
+    ('volume_change', 'volume', 'volume_change', None),
+    
+    # analyze_orderbook_sell
+    ('total_bid', 'orderbook', 'total_bid', None),
+    ('total_ask', 'orderbook', 'total_ask', None),
+    ('ask_bid_ratio', 'orderbook', 'ask_bid_ratio', None),
+    ('top_bid', 'orderbook', 'top_bid', None),
+    ('top_ask', 'orderbook', 'top_ask', None),
+    
+    # calculate_sell_indicators
+    ('rsi', 'indicators', 'rsi', None),
+    ('rsi_signal', 'indicators', 'rsi_signal', RSI_LABELS),
+    ('macd_signal', 'indicators', 'macd_signal', MACD_LABELS),
+    ('bb_signal', 'indicators', 'bb_signal', BB_LABELS),
+    ('bb_position', 'indicators', 'bb_position', None),
+    ('ma_signal', 'indicators', 'ma_signal', MA_LABELS),
+    ('stoch', 'indicators', 'stoch', None),
+    ('stoch_signal', 'indicators', 'stoch_signal', STOCH_LABELS),
+    ('daily_close', 'indicators', 'current_price', None),
+    
+    # compute_market_breadth (시장 전체 지표, 모든 코인 행에 같은 값)
+    ('breadth_down_1h', 'market', 'breadth_down_1h', None),
+    ('median_quick_drop', 'market', 'median_quick_drop', None),
+    ('median_change_1h', 'market', 'median_change_1h', None),
+    ('btc_change_1h', 'market', 'btc_change_1h', None),
+    ('breadth_markets', 'market', 'breadth_markets', 'int'),
+]
+
+FEATURE_GROUPS = ('pattern', 'volume', 'orderbook', 'indicators', 'market')
+
+# 그룹별 결과 유무(has_*) + 스키마 컬럼
+FEATURE_COLUMNS = [f"has_{group}" for group in FEATURE_GROUPS] + [column for column, _, _, _ in FEATURE_SCHEMA]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+def write_feature_group(row, group, data):
+    """분석 결과 1개(dict 또는 None)를 피처 벡터의 해당 그룹 컬럼에 기록"""
+    row[FEATURE_INDEX[f"has_{group}"]] = 1.0 if data else 0.0
+    for column, column_group, key, kind in FEATURE_SCHEMA:
+        if column_group != group:
+            continue
+        if not data:
+            row[FEATURE_INDEX[column]] = np.nan
+        elif isinstance(kind, tuple):
+            row[FEATURE_INDEX[column]] = kind.index(data[key])
+        else:
+            row[FEATURE_INDEX[column]] = float(data[key])
+
+def features_to_row(pattern_data, volume_data, orderbook_data, indicators, out=None, context=None):
+    """4개 분석 결과 + 시장 전체 지표(context)를 피처 벡터 1행으로 변환"""
+    row = np.full(len(FEATURE_COLUMNS), np.nan) if out is None else out
+    for group, data in zip(FEATURE_GROUPS, (pattern_data, volume_data, orderbook_data, indicators, context)):
+        write_feature_group(row, group, data)
+    return row
+
+def row_to_features(row):
+    """피처 벡터 1행 → (pattern_data, volume_data, orderbook_data, indicators, context)"""
+    results = {
+        group: {} if row[FEATURE_INDEX[f"has_{group}"]] == 1 else None
+        for group in FEATURE_GROUPS
+    }
+    for column, group, key, kind in FEATURE_SCHEMA:
+        if results[group] is None:
+            continue
+        value = row[FEATURE_INDEX[column]]
+        if isinstance(kind, tuple):
+            value = kind[int(value)]
+        elif kind == 'bool':
+            value = bool(value)
+        elif kind == 'int':
+            value = int(value)
+        results[group][key] = value
+    return tuple(results[group] for group in FEATURE_GROUPS)
+
+# ============================================
+# 피처 계산 (스캔 2단계, 멀티코어)
+# ============================================
+
+# 피처 계산에 영향을 주는 설정 (워커 프로세스에 그대로 전달)
+FEATURE_CONFIG_KEYS = (
+    'QUICK_DROP_LOOKBACK', 'VOLATILITY_CHECK_CANDLES',
+    'VOLUME_DECLINE_DAYS', 'DIVERGENCE_LOOKBACK_DAYS',
+    'DIVERGENCE_PRICE_THRESHOLD', 'DIVERGENCE_VOLUME_THRESHOLD',
+    'RSI_OVERBOUGHT', 'RSI_HIGH', 'STOCH_OVERBOUGHT', 'STOCH_HIGH', 'BB_HIGH_THRESHOLD',
+)
+
+def pack_candles(candles_list):
+    """
+    코인별 캔들 DataFrame을 타임프레임별 배열로 묶음
+    - {타임프레임: (data[코인, 봉, OHLCV], lengths[코인])}
+    - 코인마다 봉 개수가 달라 앞쪽부터 채우고 나머지는 NaN
+    """
+    packed = {}
+    for interval in CANDLE_INTERVALS:
+        frames = [candles[interval] for candles in candles_list]
+        lengths = np.array([len(df) for df in frames], dtype=np.int64)
+        max_len = int(lengths.max()) if len(frames) else 1
+        data = np.full((len(frames), max_len, len(CANDLE_FIELDS)), np.nan)
+        for i, df in enumerate(frames):
+            data[i, :lengths[i]] = df[list(CANDLE_FIELDS)].to_numpy(dtype=np.float64)
+        packed[interval] = (data, lengths)
+    return packed
+
+def _candle_frame(packed, interval, i):
+    """묶음 배열에서 코인 i의 캔들을 DataFrame으로 복원"""
+    data, lengths = packed[interval]
+    return pd.DataFrame(data[i, :lengths[i]], columns=list(CANDLE_FIELDS))
+
+def compute_feature_block(packed, out, start, stop):
+    """start~stop 범위 코인의 가격패턴/거래량/지표 피처를 out 배열에 기록 (호가창 제외)"""
+    for i in range(start, stop):
+        df_10m = _candle_frame(packed, 'minute10', i)
+        df_60m = _candle_frame(packed, 'minute60', i)
+        df_day = _candle_frame(packed, 'day', i)
+        
+        try:
+            pattern_data = compute_price_pattern(df_10m, df_60m, df_day.tail(30))
+        except Exception as e:
+            pattern_data = None
+        
+        try:
+            volume_data = compute_volume_decline(df_day.tail(30))
+        except Exception as e:
+            volume_data = None
+        
+        try:
+            indicators = compute_sell_indicators(df_day)
+        except Exception as e:
+            indicators = None
+        
+        features_to_row(pattern_data, volume_data, None, indicators, out=out[i])
+
+# 숫자 지표 → 라벨 기준 (바뀌면 캔들/지표 재계산 없이 라벨만 다시 매김)
+LABEL_CONFIG_KEYS = ('RSI_OVERBOUGHT', 'RSI_HIGH', 'STOCH_OVERBOUGHT', 'STOCH_HIGH', 'BB_HIGH_THRESHOLD')
+
+def relabel_indicator_signals(matrix):
+    """
+    RSI/스토캐스틱/볼린저 라벨을 숫자 컬럼 + 현재 기준값으로 다시 매김 (compute_sell_indicators와 같은 규칙)
+    - 볼린저 상단이탈(종가 ≥ 상단밴드)은 기준값과 무관하므로 그대로 유지
+    """
+    has_indicators = matrix[:, FEATURE_INDEX['has_indicators']] == 1
+    rsi = matrix[:, FEATURE_INDEX['rsi']]
+    stoch = matrix[:, FEATURE_INDEX['stoch']]
+    bb_position = matrix[:, FEATURE_INDEX['bb_position']]
+    bb_outside = matrix[:, FEATURE_INDEX['bb_signal']] == BB_LABELS.index("상단이탈")
+    
+    labels = {
+        'rsi_signal': np.select(
+            [rsi > RSI_OVERBOUGHT, rsi > RSI_HIGH],
+            [RSI_LABELS.index("과매수"), RSI_LABELS.index("고점권")], RSI_LABELS.index("중립")
+        ),
+        'stoch_signal': np.select(
+            [stoch > STOCH_OVERBOUGHT, stoch > STOCH_HIGH],
+            [STOCH_LABELS.index("과매수"), STOCH_LABELS.index("고점권")], STOCH_LABELS.index("중립")
+        ),
+        'bb_signal': np.select(
+            [bb_outside, bb_position > BB_HIGH_THRESHOLD],
+            [BB_LABELS.index("상단이탈"), BB_LABELS.index("상단근접")], BB_LABELS.index("중립")
+        ),
+    }
+    for column, values in labels.items():
+        matrix[has_indicators, FEATURE_INDEX[column]] = values[has_indicators]
+
+def group_columns(group):
+    """그룹의 피처 컬럼 인덱스 (has_* 포함)"""
+    return [FEATURE_INDEX[f"has_{group}"]] + [
+        FEATURE_INDEX[column] for column, column_group, _, _ in FEATURE_SCHEMA if column_group == group
+    ]
+
+def _to_shared(array):
+    """numpy 배열을 공유메모리로 복사 → (공유메모리, (이름, shape))"""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=np.float64, buffer=shm.buf)
+    view[:] = array
+    del view
+    return shm, (shm.name, array.shape)
+
+def _attach_shared(spec):
+    """워커에서 공유메모리 연결 → (공유메모리, numpy 뷰)"""
+    name, shape = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+def _compute_shared_block(handles, candle_specs, out_spec, start, stop):
+    """공유메모리 배열을 붙여서 피처 계산 (뷰는 함수 종료 시 해제)"""
+    packed = {}
+    for interval, (data_spec, lengths) in candle_specs.items():
+        shm, data = _attach_shared(data_spec)
+        handles.append(shm)
+        packed[interval] = (data, lengths)
+    
+    shm, out = _attach_shared(out_spec)
+    handles.append(shm)
+    compute_feature_block(packed, out, start, stop)
+
+def _compute_worker(task):
+    """워커 프로세스 진입점: 코인 범위 1개 계산 (DataFrame 피클링 없음)"""
+    candle_specs, out_spec, start, stop, settings = task
+    globals().update(settings)
+    handles = []
+    try:
+        _compute_shared_block(handles, candle_specs, out_spec, start, stop)
+    finally:
+        for shm in handles:
+            shm.close()
+    return stop - start
+
+def compute_workers():
+    """피처 계산 프로세스 수 (COMPUTE_WORKERS = 0 이면 CPU 코어 수)"""
+    return COMPUTE_WORKERS or os.cpu_count() or 1
+
+def compute_feature_matrix(packed, n_markets, workers=None, pool=None):
+    """
+    전체 코인의 피처 행렬 계산 [코인, FEATURE_COLUMNS]
+    - 코인 수가 PARALLEL_MIN_MARKETS 미만이거나 코어가 1개면 현재 프로세스에서 계산
+    - 그 외에는 캔들/결과 배열을 공유메모리에 올리고 프로세스 풀이 코인 범위별로 계산
+    - pool: 재사용할 프로세스 풀 (데몬 모드, 없으면 이번 계산용으로 새로 생성)
+    """
+    if workers is None:
+        workers = compute_workers()
+    
+    if n_markets < PARALLEL_MIN_MARKETS or workers <= 1:
+        out = np.full((n_markets, len(FEATURE_COLUMNS)), np.nan)
+        compute_feature_block(packed, out, 0, n_markets)
+        return out
+    
+    shared = []
+    try:
+        candle_specs = {}
+        for interval, (data, lengths) in packed.items():
+            shm, spec = _to_shared(data)
+            shared.append(shm)
+            candle_specs[interval] = (spec, lengths)
+        
+        out_shm, out_spec = _to_shared(np.full((n_markets, len(FEATURE_COLUMNS)), np.nan))
+        shared.append(out_shm)
+        
+        # 코어당 4개 정도로 나눠서 부하 균형
+        settings = {key: globals()[key] for key in FEATURE_CONFIG_KEYS}
+        chunk = max(1, math.ceil(n_markets / (workers * 4)))
+        tasks = [
+            (candle_specs, out_spec, start, min(start + chunk, n_markets), settings)
+            for start in range(0, n_markets, chunk)
+        ]
+        if pool is not None:
+            list(pool.map(_compute_worker, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_compute_worker, tasks))
+        
+        out = np.ndarray(out_spec[1], dtype=np.float64, buffer=out_shm.buf).copy()
+        return out
+    finally:
+        for shm in shared:
+            shm.close()
+            shm.unlink()
+
+# ============================================
+# 시장 전체 지표 (스캔당 1번, 전체 코인 단면)
+# ============================================
+
+# 시장 지표의 기준 코인
+BREADTH_REFERENCE_MARKET = "KRW-BTC"
+
+def compute_market_breadth(matrix, markets):
+    """
+    전체 코인 피처 행렬 → 시장 전체 지표 (가격 패턴을 계산한 코인 기준, 없으면 None)
+    - breadth_down_1h: 1시간 BREADTH_DROP_1H% 이상 하락한 코인 비율(%)
+    - median_quick_drop / median_change_1h: 단기급락폭 / 1시간 변화 중앙값
+    - btc_change_1h: 비트코인 1시간 변화 (이번 스캔에서 분석 못 했으면 NaN)
+    """
+    has_pattern = matrix[:, FEATURE_INDEX['has_pattern']] == 1
+    n_markets = int(has_pattern.sum())
+    if n_markets == 0:
         return None
+    
+    change_1h = matrix[:, FEATURE_INDEX['change_1h']]
+    quick_drop = matrix[:, FEATURE_INDEX['quick_drop']]
+    btc_change_1h = np.nan
+    if BREADTH_REFERENCE_MARKET in markets:
+        btc = markets.index(BREADTH_REFERENCE_MARKET)
+        if has_pattern[btc]:
+            btc_change_1h = change_1h[btc]
+    
+    return {
+        'breadth_down_1h': float(np.mean(change_1h[has_pattern] <= -BREADTH_DROP_1H) * 100),
+        'median_quick_drop': float(np.nanmedian(quick_drop[has_pattern])),
+        'median_change_1h': float(np.nanmedian(change_1h[has_pattern])),
+        'btc_change_1h': float(btc_change_1h),
+        'breadth_markets': n_markets,
+    }
+
+def write_market_context(matrix, context):
+    """시장 전체 지표를 모든 코인 행의 market 컬럼에 기록 (규칙에서 코인 피처처럼 사용)"""
+    if not len(matrix):
+        return
+    columns = group_columns('market')
+    write_feature_group(matrix[0], 'market', context)
+    matrix[1:, columns] = matrix[0, columns]
+
+def is_market_wide_drop(context):
+    """하락 코인 비율이 BREADTH_ALERT_THRESHOLD 이상인지 (개별 알림을 1건으로 묶을지)"""
+    return bool(BREADTH_ALERT_THRESHOLD and context and context['breadth_down_1h'] >= BREADTH_ALERT_THRESHOLD)
+
+def format_market_context(context):
+    """시장 전체 지표 요약 (텔레그램/콘솔용)"""
+    btc = context['btc_change_1h']
+    btc_text = f"{btc:+.1f}%" if not math.isnan(btc) else "-"
+    return (
+        f"1시간 -{BREADTH_DROP_1H:g}% 이상 하락 {context['breadth_down_1h']:.0f}% "
+        f"({context['breadth_markets']}개 중), 1시간 변화 중앙값 {context['median_change_1h']:+.1f}%, "
+        f"단기급락 중앙값 -{context['median_quick_drop']:.1f}%, BTC 1시간 {btc_text}"
+    )
+
+# ============================================
+# 벤치마크 (합성 데이터)
+# ============================================
+
+def make_synthetic_candles(n_markets, seed=0):
+    """벤치마크용 랜덤워크 캔들 생성 (API 호출 없음)"""
+    rng = np.random.default_rng(seed)
+    packed = {}
+    for interval, count in (('minute10', MINUTE_10_COUNT), ('minute60', MINUTE_60_COUNT), ('day', 100)):
+        shape = (n_markets, count)
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, shape), axis=1))
+        open_ = close * (1 + rng.normal(0, 0.005, shape))
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, shape))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, shape))
+        volume = rng.uniform(1e3, 1e5, shape)
+        data = np.stack([open_, high, low, close, volume], axis=2)
+        packed[interval] = (data, np.full(n_markets, count, dtype=np.int64))
+    return packed
+
+def run_benchmark(n_markets):
+    """피처 계산 단계를 워커 수별로 측정 (합성 코인 n개)"""
+    print(f"🧪 합성 벤치마크: 코인 {n_markets}개")
+    packed = make_synthetic_candles(n_markets)
+    
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({w for w in (1, 2, 4, 8, 16, 32) if w <= cpu_count} | {cpu_count})
+    
+    base_elapsed = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        matrix = compute_feature_matrix(packed, n_markets, workers=workers)
+        elapsed = time.perf_counter() - start
+        base_elapsed = base_elapsed or elapsed
+        speedup = base_elapsed / elapsed
+        print(f"   워커 {workers:>2}개: {elapsed:7.2f}초 (속도 {speedup:4.1f}배, 효율 {speedup / workers * 100:3.0f}%)")
+    
+    # 프로필 추가 비용: 같은 피처 행렬에 점수 계산만 반복
+    print(f"👥 프로필 수별 점수 계산 (피처 계산 {base_elapsed:.2f}초는 공유)")
+    for n_profiles in (1, 5, 10, 20):
+        profiles = [{'name': DEFAULT_PROFILE_NAME}] + [
+            {'name': f"bench{k}", 'QUICK_DROP_THRESHOLD': 3.0 + k * 0.5, 'SELL_STAGE_REVIEW': 2 + k % 3}
+            for k in range(1, n_profiles)
+        ]
+        start = time.perf_counter()
+        score_markets(matrix, profiles)
+        elapsed = time.perf_counter() - start
+        print(f"   프로필 {n_profiles:>2}개: {elapsed:7.3f}초 (프로필당 {elapsed / n_profiles * 1000:6.1f}ms)")
+
+# ============================================
+# 알림 프로필 (같은 스캔 결과를 여러 기준으로 평가)
+# ============================================
+
+# 프로필별로 바꿀 수 있는 설정 (점수/단계/필터/텔레그램 목적지)
+# - 캔들 개수, 룩백 기간 등 피처 계산 설정은 모든 프로필이 공유 (한 번만 계산)
+PROFILE_KEYS = (
+    'CHAT_ID',
+    'QUICK_DROP_THRESHOLD', 'DROP_FROM_HIGH_12H_THRESHOLD', 'SURGE_6H_THRESHOLD',
+    'CHANGE_1H_THRESHOLD', 'VOLATILITY_THRESHOLD', 'ORDERBOOK_THRESHOLD', 'RSI_OVERBOUGHT',
+    'SELL_STAGE_REVIEW', 'SELL_STAGE_PREPARE', 'SELL_STAGE_IMMEDIATE',
+    'MIN_QUICK_DROP', 'MIN_DROP_12H',
+)
+
+DEFAULT_PROFILE_NAME = '기본'
+
+def get_setting(key, profile=None):
+    """프로필 설정값 (프로필에 없으면 config.py 값)"""
+    if profile and key in profile:
+        return profile[key]
+    return globals()[key]
+
+def build_profiles():
+    """
+    기본 프로필(config.py 값) + PROFILES → 프로필 목록
+    - PROFILE_KEYS와 규칙 임계값 설정키 외에는 피처 계산에 영향을 주므로 바꿀 수 없음
+    - CHAT_ID 외 설정값은 숫자만 허용 (점수/단계/필터 배열 연산에 사용)
+    - 알림 묶음/조회 응답이 프로필 이름으로 구분되므로 기본 프로필 이름은 사용 불가
+    """
+    allowed = set(PROFILE_KEYS) | rule_setting_keys(get_signal_rules())
+    profiles = [{'name': DEFAULT_PROFILE_NAME}]
+    for name, overrides in PROFILES.items():
+        if name == DEFAULT_PROFILE_NAME:
+            raise ValueError(f"프로필 이름 '{name}'은(는) 기본 프로필 이름이라 사용할 수 없습니다")
+        unknown = set(overrides) - allowed
+        if unknown:
+            raise ValueError(f"프로필 '{name}'에서 바꿀 수 없는 설정: {', '.join(sorted(unknown))}")
+        invalid = [key for key, value in overrides.items() if key != 'CHAT_ID' and not _is_number(value)]
+        if invalid:
+            raise ValueError(
+                f"프로필 '{name}'의 설정값은 숫자여야 합니다: "
+                f"{', '.join(f'{key}={overrides[key]!r}' for key in sorted(invalid))}"
+            )
+        profiles.append({'name': name, **overrides})
+    return profiles
+
+def score_markets(matrix, profiles):
+    """
+    전체 코인 × 전체 프로필 점수 계산 (규칙을 배열 연산으로 한 번에 평가)
+    - 피처 계산은 공유하고 프로필마다 임계값만 다르게 적용
+    - 반환: scores[프로필, 코인] (가격 패턴 없으면 NaN), passed[프로필, 코인],
+      masks[프로필, 코인, 규칙] (발동한 규칙 → 알림 문구), stages[프로필, 코인] (SELL_STAGES 인덱스)
+    """
+    compiled = compile_signal_rules(get_signal_rules(), profiles)
+    scores, masks, stages = evaluate_signal_rules(compiled, matrix)
+    
+    has_pattern = matrix[:, FEATURE_INDEX['has_pattern']] == 1
+    scores = np.where(has_pattern[None, :], scores, np.nan)
+    stages = np.where(has_pattern[None, :], stages, 0)
+    
+    # 필터링: 최소한의 변동이 있는 코인만
+    min_quick_drop = compiled['filter_thresholds'][:, 0:1]
+    min_drop_12h = compiled['filter_thresholds'][:, 1:2]
+    quiet = (
+        (matrix[None, :, FEATURE_INDEX['quick_drop']] < min_quick_drop)
+        & (matrix[None, :, FEATURE_INDEX['drop_from_high_12h']] < min_drop_12h)
+    )
+    passed = has_pattern[None, :] & ~quiet
+    return scores, passed, masks, stages
 
 # ============================================
-# 매도 신호 강도 계산 (개선)
+# 매도 신호 규칙 (선언형, 전체 코인 한 번에 계산)
 # ============================================
 
-def calculate_sell_signal_strength(pattern_data, volume_data, orderbook_data, indicators):
-    """10개 지표 기반 매도 신호 강도 계산 (급락 감지 추가)"""
-    score = 0
-    signals = []
-    
-    # 가격 패턴 분석 (4개 - 추가됨!)
-    if pattern_data:
-        # 1. 단기 급락 (10분봉 기준 - NEW!)
-        if pattern_data['quick_drop'] > QUICK_DROP_THRESHOLD:
-            score += 1
-            signals.append(f"✅ 단기급락 {pattern_data['minutes_since_high']}분전 -{pattern_data['quick_drop']:.1f}%")
-        
-        # 2. 중기 고점 대비 하락 (12시간)
-        if pattern_data['drop_from_high_12h'] > DROP_FROM_HIGH_12H_THRESHOLD:
-            score += 1
-            signals.append(f"✅ 12시간 고점대비 -{pattern_data['drop_from_high_12h']:.1f}%")
-        
-        # 3. 급등 후 하락 전환
-        if pattern_data['surge_6h'] > SURGE_6H_THRESHOLD and pattern_data['change_1h'] < CHANGE_1H_THRESHOLD:
-            score += 1
-            signals.append("✅ 급등 후 하락전환")
-        
-        # 4. 변동성 급증 (급락 직전 신호)
-        if pattern_data['avg_volatility'] > VOLATILITY_THRESHOLD:
-            score += 1
-            signals.append(f"✅ 고변동성 {pattern_data['avg_volatility']:.1f}%")
+# 기본 10개 지표 규칙 (config.py의 SIGNAL_RULES로 교체 가능)
+# - feature / op / threshold: 피처 컬럼, 비교연산자, 임계값
+#   임계값이 문자열이면 설정키 이름 (프로필별 값 적용), 범주형 피처는 라벨 (in은 라벨 목록)
+# - and: 함께 만족해야 하는 추가 조건 [(피처, 연산자, 임계값), ...]
+# - weight: 점수 가중치, label: 발동 시 문구 (피처 값으로 format)
+DEFAULT_SIGNAL_RULES = [
+    # 가격 패턴 분석 (4개)
+    {'feature': 'quick_drop', 'op': '>', 'threshold': 'QUICK_DROP_THRESHOLD', 'weight': 1,
+     'label': "✅ 단기급락 {minutes_since_high}분전 -{quick_drop:.1f}%"},
+    {'feature': 'drop_from_high_12h', 'op': '>', 'threshold': 'DROP_FROM_HIGH_12H_THRESHOLD', 'weight': 1,
+     'label': "✅ 12시간 고점대비 -{drop_from_high_12h:.1f}%"},
+    {'feature': 'surge_6h', 'op': '>', 'threshold': 'SURGE_6H_THRESHOLD',
+     'and': [('change_1h', '<', 'CHANGE_1H_THRESHOLD')], 'weight': 1,
+     'label': "✅ 급등 후 하락전환"},
+    {'feature': 'avg_volatility', 'op': '>', 'threshold': 'VOLATILITY_THRESHOLD', 'weight': 1,
+     'label': "✅ 고변동성 {avg_volatility:.1f}%"},
     
     # 거래량 분석 (2개)
-    if volume_data:
-        # 5. 거래량 감소 추세
-        if volume_data['volume_declining']:
-            score += 1
-            signals.append("✅ 거래량 감소 추세")
-        
-        # 6. 가격-거래량 다이버전스
-        if volume_data['divergence_signal']:
-            score += 1
-            signals.append("✅ 약세 다이버전스")
+    {'feature': 'volume_declining', 'op': '==', 'threshold': True, 'weight': 1,
+     'label': "✅ 거래량 감소 추세"},
+    {'feature': 'divergence_signal', 'op': '==', 'threshold': True, 'weight': 1,
+     'label': "✅ 약세 다이버전스"},
     
     # 호가창 (1개)
-    if orderbook_data:
-        # 7. 매도벽 우세
-        if orderbook_data['ask_bid_ratio'] > ORDERBOOK_THRESHOLD:
-            score += 1
-            signals.append("✅ 매도벽 우세")
+    {'feature': 'ask_bid_ratio', 'op': '>', 'threshold': 'ORDERBOOK_THRESHOLD', 'weight': 1,
+     'label': "✅ 매도벽 우세"},
     
     # 기술적 지표 (3개)
-    if indicators:
-        # 8. RSI 과매수
-        if indicators['rsi'] > RSI_OVERBOUGHT:
-            score += 1
-            signals.append("✅ RSI 과매수")
+    {'feature': 'rsi', 'op': '>', 'threshold': 'RSI_OVERBOUGHT', 'weight': 1,
+     'label': "✅ RSI 과매수"},
+    {'feature': 'macd_signal', 'op': '==', 'threshold': "데드크로스", 'weight': 1,
+     'label': "✅ MACD 데드크로스"},
+    {'feature': 'bb_signal', 'op': 'in', 'threshold': ["상단이탈", "상단근접"], 'weight': 1,
+     'label': "✅ 볼린저 상단권"},
+]
+
+SIGNAL_OPS = {
+    '>': np.greater, '>=': np.greater_equal,
+    '<': np.less, '<=': np.less_equal,
+    '==': np.equal, '!=': np.not_equal,
+}
+
+STAGE_KEYS = ('SELL_STAGE_REVIEW', 'SELL_STAGE_PREPARE', 'SELL_STAGE_IMMEDIATE')
+
+# 컬럼명 → (그룹, 타입)
+FEATURE_SPECS = {column: (group, kind) for column, group, _, kind in FEATURE_SCHEMA}
+
+def get_signal_rules():
+    """현재 적용 중인 규칙 (config.py의 SIGNAL_RULES가 없으면 기본 10개)"""
+    return SIGNAL_RULES or DEFAULT_SIGNAL_RULES
+
+def _rule_conditions(rule):
+    """규칙의 조건 목록 [(피처, 연산자, 임계값), ...]"""
+    return [(rule['feature'], rule['op'], rule['threshold'])] + [tuple(c) for c in rule.get('and', [])]
+
+def rule_setting_keys(rules):
+    """규칙이 임계값으로 참조하는 설정키 목록 (프로필에서 바꿀 수 있음)"""
+    keys = set()
+    for rule in rules:
+        for column, op, threshold in _rule_conditions(rule):
+            if isinstance(threshold, str) and not isinstance(FEATURE_SPECS[column][1], tuple):
+                keys.add(threshold)
+    return keys
+
+def _is_number(value):
+    """숫자 여부 (bool 제외)"""
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+def _sample_feature_value(kind):
+    """라벨 format 검사용 피처 값 (feature_values와 같은 타입)"""
+    if isinstance(kind, tuple):
+        return kind[0]
+    return {'bool': True, 'int': 0}.get(kind, 0.0)
+
+def validate_signal_rules(rules):
+    """규칙 검증 (잘못된 피처/연산자/설정키/임계값/가중치/라벨이면 ValueError)"""
+    samples = {column: _sample_feature_value(kind) for column, (_, kind) in FEATURE_SPECS.items()}
+    for i, rule in enumerate(rules, 1):
+        missing = [key for key in ('feature', 'op', 'threshold', 'label') if key not in rule]
+        if missing:
+            raise ValueError(f"규칙 {i}: {', '.join(missing)}이(가) 없습니다")
+        if not _is_number(rule.get('weight', 1)):
+            raise ValueError(f"규칙 {i}: weight는 숫자여야 합니다 ({rule['weight']!r})")
         
-        # 9. MACD 데드크로스
-        if indicators['macd_signal'] == "데드크로스":
-            score += 1
-            signals.append("✅ MACD 데드크로스")
+        # 라벨의 {피처} 자리표시자: 알림 발송 때 처음 format하므로 여기서 미리 확인
+        try:
+            fields = [field for _, field, _, _ in string.Formatter().parse(rule['label']) if field is not None]
+        except ValueError as e:
+            raise ValueError(f"규칙 {i}: 라벨 형식 오류 ({e})")
+        unknown = [field for field in fields if field not in FEATURE_SPECS]
+        if unknown:
+            raise ValueError(f"규칙 {i}: 라벨에 알 수 없는 피처 {unknown}")
+        try:
+            format_rule_label(rule['label'], samples)
+        except (ValueError, TypeError, IndexError, KeyError) as e:
+            raise ValueError(f"규칙 {i}: 라벨 형식 오류 ({e})")
         
-        # 10. 볼린저 상단 이탈
-        if indicators['bb_signal'] in ["상단이탈", "상단근접"]:
-            score += 1
-            signals.append("✅ 볼린저 상단권")
+        for condition in _rule_conditions(rule):
+            if len(condition) != 3:
+                raise ValueError(f"규칙 {i}: 조건은 (피처, 연산자, 임계값)이어야 합니다 ({condition!r})")
+            column, op, threshold = condition
+            if column not in FEATURE_SPECS:
+                raise ValueError(f"규칙 {i}: 알 수 없는 피처 '{column}'")
+            if op != 'in' and op not in SIGNAL_OPS:
+                raise ValueError(f"규칙 {i}: 알 수 없는 연산자 '{op}'")
+            kind = FEATURE_SPECS[column][1]
+            if isinstance(kind, tuple):
+                labels = threshold if op == 'in' else [threshold]
+                unknown = [label for label in labels if label not in kind]
+                if unknown:
+                    raise ValueError(f"규칙 {i}: '{column}'에 없는 라벨 {unknown} (가능: {', '.join(kind)})")
+            elif op == 'in':
+                raise ValueError(f"규칙 {i}: in 연산자는 범주형 피처에만 사용할 수 있습니다")
+            elif isinstance(threshold, str):
+                if threshold not in globals():
+                    raise ValueError(f"규칙 {i}: 알 수 없는 설정키 '{threshold}'")
+                if not isinstance(globals()[threshold], numbers.Real):
+                    raise ValueError(f"규칙 {i}: 설정키 '{threshold}'의 값이 숫자가 아닙니다")
+            elif not isinstance(threshold, numbers.Real):
+                raise ValueError(f"규칙 {i}: '{column}'의 임계값은 숫자 또는 설정키여야 합니다 ({threshold!r})")
+
+def _resolve_threshold(column, op, threshold, profile):
+    """임계값 → 숫자 (설정키는 프로필 값, 범주형 라벨은 인덱스)"""
+    kind = FEATURE_SPECS[column][1]
+    if isinstance(kind, tuple):
+        if op == 'in':
+            return [kind.index(label) for label in threshold]
+        return kind.index(threshold)
+    if isinstance(threshold, str):
+        return get_setting(threshold, profile)
+    return threshold
+
+def compile_signal_rules(rules, profiles):
+    """
+    규칙 + 프로필 → 배열 연산용 구조
+    - 조건마다 (규칙 번호, 피처 컬럼, 그룹 유무 컬럼, 연산자, 프로필별 임계값)
+    - 가중치/단계/필터 기준도 프로필별 배열로 준비
+    """
+    conditions = []
+    for r, rule in enumerate(rules):
+        for column, op, threshold in _rule_conditions(rule):
+            group = FEATURE_SPECS[column][0]
+            conditions.append((
+                r, FEATURE_INDEX[column], FEATURE_INDEX[f"has_{group}"], op,
+                [_resolve_threshold(column, op, threshold, profile) for profile in profiles],
+            ))
+    
+    return {
+        'rules': rules,
+        'conditions': conditions,
+        'weights': np.array([rule.get('weight', 1) for rule in rules], dtype=np.float64),
+        'stage_thresholds': np.array(
+            [[get_setting(key, profile) for key in STAGE_KEYS] for profile in profiles], dtype=np.float64
+        ),
+        'filter_thresholds': np.array(
+            [[get_setting('MIN_QUICK_DROP', profile), get_setting('MIN_DROP_12H', profile)] for profile in profiles],
+            dtype=np.float64
+        ),
+    }
+
+def evaluate_signal_rules(compiled, matrix):
+    """
+    피처 행렬 전체를 한 번에 평가
+    - 반환: scores[프로필, 코인], masks[프로필, 코인, 규칙], stages[프로필, 코인]
+      (stage 0=없음, 1=매도검토, 2=매도준비, 3=즉시매도)
+    - 그룹 결과가 없는 코인(예: 호가창 None)은 해당 그룹 규칙이 발동하지 않음
+    """
+    n_profiles = len(compiled['stage_thresholds'])
+    masks = np.ones((n_profiles, len(matrix), len(compiled['rules'])), dtype=bool)
+    
+    for r, column, has_column, op, thresholds in compiled['conditions']:
+        values = matrix[:, column]
+        if op == 'in':
+            hit = np.broadcast_to(np.isin(values, thresholds[0]), (n_profiles, len(matrix)))
+        else:
+            hit = SIGNAL_OPS[op](values[None, :], np.array(thresholds, dtype=np.float64)[:, None])
+        masks[:, :, r] &= hit & (matrix[:, has_column] == 1)[None, :]
+    
+    scores = masks @ compiled['weights']
+    stages = stage_codes(scores, compiled['stage_thresholds'][:, None, :])
+    return scores, masks, stages
+
+def stage_codes(scores, thresholds):
+    """
+    점수 → 단계 인덱스 (0=없음, 1=매도검토, 2=매도준비, 3=즉시매도, SELL_STAGES 인덱스)
+    - thresholds[..., 0:3]: STAGE_KEYS 순서 기준값 (scores와 브로드캐스트)
+    """
+    review, prepare, immediate = (thresholds[..., k] for k in range(3))
+    return np.select([scores >= immediate, scores >= prepare, scores >= review], [3, 2, 1], 0)
+
+def _score_value(score):
+    """점수 표시용 (정수 가중치면 int)"""
+    score = float(score)
+    return int(score) if score.is_integer() else score
+
+def format_signal_score(score):
+    """'점수/만점' 문자열 (만점 = 규칙 가중치 합)"""
+    max_score = sum(rule.get('weight', 1) for rule in get_signal_rules())
+    return f"{_score_value(score)}/{_score_value(max_score)}"
+
+def feature_values(row):
+    """피처 벡터 1행 → {컬럼명: 값} (규칙 label 포맷용)"""
+    values = {}
+    for column, (group, kind) in FEATURE_SPECS.items():
+        if row[FEATURE_INDEX[f"has_{group}"]] != 1:
+            continue
+        value = row[FEATURE_INDEX[column]]
+        if isinstance(kind, tuple):
+            value = kind[int(value)]
+        elif kind == 'bool':
+            value = bool(value)
+        elif kind == 'int':
+            value = int(value)
+        values[column] = value
+    return values
+
+class _LabelFormatter(string.Formatter):
+    """규칙 label 포맷: 값이 없는 피처(그룹 결과 없음, NaN)는 형식 지정과 상관없이 '-'"""
+    
+    def get_value(self, key, args, kwargs):
+        if isinstance(key, str):
+            return kwargs.get(key)
+        return super().get_value(key, args, kwargs)
+    
+    def format_field(self, value, format_spec):
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return '-'
+        return super().format_field(value, format_spec)
+
+_label_formatter = _LabelFormatter()
+
+def format_rule_label(label, values):
+    """규칙 label → 알림 문구 (values: feature_values 결과, 없는 피처는 '-')"""
+    return _label_formatter.vformat(label, (), values)
+
+def calculate_sell_signal_strength(pattern_data, volume_data, orderbook_data, indicators, profile=None, context=None):
+    """
+    10개 지표(SIGNAL_RULES) 기반 매도 신호 강도 계산 (profile 지정 시 해당 기준 적용)
+    - context: 시장 전체 지표 (규칙에서 breadth_down_1h, btc_change_1h 등으로 참조)
+    """
+    rules = get_signal_rules()
+    row = features_to_row(pattern_data, volume_data, orderbook_data, indicators, context=context)
+    scores, masks, _ = evaluate_signal_rules(compile_signal_rules(rules, [profile]), row[None, :])
     
-    return score, signals
+    return _score_value(scores[0, 0]), rule_signals(rules, masks[0, 0], feature_values(row))
+
+def rule_signals(rules, mask, values):
+    """발동한 규칙(mask[규칙]) → 알림 문구 목록"""
+    return [format_rule_label(rule['label'], values) for rule, hit in zip(rules, mask) if hit]
 
 # ============================================
 # 매도 단계 판단
 # ============================================
 
-def determine_sell_stage(score):
-    """매도 단계 3단계 구분"""
-    if score >= SELL_STAGE_IMMEDIATE:
-        return {
-            'stage': '즉시매도',
-            'emoji': '🔴',
-            'stars': '⭐' * 5,
-            'color': 'red',
-            'action': '즉시 매도 권장'
-        }
-    elif score >= SELL_STAGE_PREPARE:
-        return {
-            'stage': '매도준비',
-            'emoji': '🟠',
-            'stars': '⭐' * 3,
-            'color': 'orange',
-            'action': '일부 매도 고려'
-        }
-    elif score >= SELL_STAGE_REVIEW:
-        return {
-            'stage': '매도검토',
-            'emoji': '🟡',
-            'stars': '⭐' * 2,
-            'color': 'yellow',
-            'action': '주의 관찰 필요'
-        }
-    else:
-        return None
+# 단계 인덱스(stage_codes) → 표시 정보
+SELL_STAGES = (
+    None,
+    {'stage': '매도검토', 'emoji': '🟡', 'stars': '⭐' * 2, 'color': 'yellow', 'action': '주의 관찰 필요'},
+    {'stage': '매도준비', 'emoji': '🟠', 'stars': '⭐' * 3, 'color': 'orange', 'action': '일부 매도 고려'},
+    {'stage': '즉시매도', 'emoji': '🔴', 'stars': '⭐' * 5, 'color': 'red', 'action': '즉시 매도 권장'},
+)
+
+def determine_sell_stage(score, profile=None):
+    """매도 단계 3단계 구분 (점수 1개용, 스캔에서는 score_markets의 stages 사용)"""
+    thresholds = np.array([get_setting(key, profile) for key in STAGE_KEYS], dtype=np.float64)
+    return SELL_STAGES[int(stage_codes(np.float64(score), thresholds))]
 
 # ============================================
 # 텔레그램 메시지 포맷팅 (매도용)
 # ============================================
 
-def format_sell_telegram_message(coin, score, signals, pattern_data, volume_data, orderbook_data, indicators):
-    """텔레그램 매도 메시지 생성"""
+def format_sell_telegram_message(coin, score, signals, pattern_data, volume_data, orderbook_data, indicators, profile=None, context=None, stage_info=None):
+    """텔레그램 매도 메시지 생성 (stage_info 생략 시 점수로 판단)"""
     
-    stage_info = determine_sell_stage(score)
+    stage_info = stage_info or determine_sell_stage(score, profile)
     if stage_info is None:
         return None
     
@@ -427,6 +1609,8 @@ def format_sell_telegram_message(coin, score, signals, pattern_data, volume_data
     
     # 메시지 구성
     message = f"{stage_info['emoji']} [{coin_name}] {stage_info['stage']} {stage_info['stars']}\n"
+    if profile and profile['name'] != DEFAULT_PROFILE_NAME:
+        message += f"👤 프로필: {profile['name']}\n"
     message += "━━━━━━━━━━━━━━━━━━━━━\n"
     message += f"💰 현재가: {pattern_data['current_price']:,.0f}원\n"
     message += f"🎯 권장행동: {stage_info['action']}\n\n"
@@ -467,13 +1651,13 @@ def format_sell_telegram_message(coin, score, signals, pattern_data, volume_data
     
     if orderbook_data:
         message += f"\n📊 호가창: 매도/매수 비율 {orderbook_data['ask_bid_ratio']:.2f}\n"
-        if orderbook_data['ask_bid_ratio'] > ORDERBOOK_THRESHOLD:
+        if orderbook_data['ask_bid_ratio'] > get_setting('ORDERBOOK_THRESHOLD', profile):
             message += f"   └ 매도벽 우세 ▶ 하방 압력\n"
     
     message += "\n【 기술적 지표 】\n"
     
     if indicators:
-        rsi_emoji = "✅" if indicators['rsi'] > RSI_OVERBOUGHT else "⚠️" if indicators['rsi'] > RSI_HIGH else "📊"
+        rsi_emoji = "✅" if indicators['rsi'] > get_setting('RSI_OVERBOUGHT', profile) else "⚠️" if indicators['rsi'] > RSI_HIGH else "📊"
         message += f"{rsi_emoji} RSI: {indicators['rsi']:.1f} → {indicators['rsi_signal']}\n"
         
         macd_emoji = "✅" if indicators['macd_signal'] == '데드크로스' else "📊"
@@ -488,20 +1672,126 @@ def format_sell_telegram_message(coin, score, signals, pattern_data, volume_data
         stoch_emoji = "✅" if indicators['stoch'] > STOCH_OVERBOUGHT else "⚠️" if indicators['stoch'] > STOCH_HIGH else "📊"
         message += f"{stoch_emoji} 스토캐스틱: {indicators['stoch']:.1f} → {indicators['stoch_signal']}\n"
     
+    if context:
+        message += "\n【 시장 전체 】\n"
+        message += f"🌐 {format_market_context(context)}\n"
+    
     message += "\n━━━━━━━━━━━━━━━━━━━━━\n"
-    message += f"🎯 종합판단: {score}/10 지표 일치\n"
+    message += f"🎯 종합판단: {format_signal_score(score)} 지표 일치\n"
     message += f"⏰ 발생시각(KST): {format_kst_time()}"
     
     return message
 
+def format_market_wide_message(context, alerts, profile=None):
+    """
+    시장 전체 하락 시 묶음 알림 메시지
+    - alerts: [(코인, 점수), ...] 이번 스캔에서 알림 기준을 넘은 코인
+    """
+    message = "🌐 시장 전체 하락 감지\n"
+    if profile and profile['name'] != DEFAULT_PROFILE_NAME:
+        message += f"👤 프로필: {profile['name']}\n"
+    message += "━━━━━━━━━━━━━━━━━━━━━\n"
+    message += f"📉 {format_market_context(context)}\n"
+    message += f"🚨 매도신호 {len(alerts)}개 (개별 알림 대신 1건으로 묶음)\n\n"
+    
+    alerts = sorted(alerts, key=lambda alert: -alert[1])
+    for stage in ('즉시매도', '매도준비', '매도검토'):
+        items = [(coin, score) for coin, score in alerts if determine_sell_stage(score, profile)['stage'] == stage]
+        if not items:
+            continue
+        emoji = determine_sell_stage(items[0][1], profile)['emoji']
+        coins = ", ".join(f"{coin.replace('KRW-', '')}({format_signal_score(score)})" for coin, score in items[:30])
+        message += f"{emoji} {stage} {len(items)}개: {coins}{' ...' if len(items) > 30 else ''}\n"
+    
+    message += "\n━━━━━━━━━━━━━━━━━━━━━\n"
+    message += f"⏰ 발생시각(KST): {format_kst_time()}"
+    return message
+
+# ============================================
+# 피처 스냅샷 저장 (전체 코인, 컬럼 단위)
+# ============================================
+
+def save_feature_snapshot(markets, matrix, extra_columns, scan_time=None):
+    """
+    스캔 1회분 전체 코인의 피처 벡터를 압축 컬럼 파일로 저장
+    - extra_columns: 피처 외 코인별 컬럼 (score, passed_filter, 프로필별 score_<이름> 등)
+    - 경로: SNAPSHOT_DIR/date=YYYY-MM-DD/scan_HHMMSS.npz (KST 날짜별 폴더)
+    - 컬럼마다 별도 배열로 저장 → 읽을 때 필요한 컬럼만 압축 해제
+    - 범주형 지표(rsi_signal 등)는 *_LABELS 튜플의 인덱스로 저장
+    """
+    try:
+        scan_time = scan_time or get_kst_now()
+        folder = os.path.join(SNAPSHOT_DIR, f"date={scan_time.strftime('%Y-%m-%d')}")
+        os.makedirs(folder, exist_ok=True)
+        filename = os.path.join(folder, f"scan_{scan_time.strftime('%H%M%S')}.npz")
+        
+        columns = {
+            'scan_time': np.full(len(markets), int(scan_time.timestamp()), dtype=np.int64),
+            'market': np.array(markets, dtype=str),
+            **extra_columns,
+        }
+        for name in FEATURE_COLUMNS:
+            columns[name] = matrix[:, FEATURE_INDEX[name]]
+        
+        # 한 번에 기록 (코인별 append 없음)
+        np.savez_compressed(filename, **columns)
+        print(f"💾 피처 스냅샷 저장: {filename} ({len(markets)}개 코인)")
+        return filename
+    except Exception as e:
+        print(f"피처 스냅샷 저장 오류: {e}")
+        return None
+
+def load_snapshot_column(column, start_date=None, end_date=None, snapshot_dir=None):
+    """
+    여러 스캔에 걸친 컬럼 1개만 읽기 (다른 피처 컬럼은 압축 해제하지 않음)
+    - start_date / end_date: 'YYYY-MM-DD' (포함), 생략 시 전체 기간
+    - 반환: DataFrame [scan_time(KST), market, column]
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    frames = []
+    if not os.path.isdir(snapshot_dir):
+        return pd.DataFrame(columns=['scan_time', 'market', column])
+    
+    for partition in sorted(os.listdir(snapshot_dir)):
+        if not partition.startswith('date='):
+            continue
+        date = partition[len('date='):]
+        if (start_date and date < start_date) or (end_date and date > end_date):
+            continue
+        
+        folder = os.path.join(snapshot_dir, partition)
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith('.npz'):
+                continue
+            with np.load(os.path.join(folder, name)) as snapshot:
+                if column not in snapshot.files:
+                    continue
+                frames.append(pd.DataFrame({
+                    'scan_time': pd.to_datetime(snapshot['scan_time'], unit='s', utc=True).tz_convert(KST),
+                    'market': snapshot['market'],
+                    column: snapshot[column],
+                }))
+    
+    if not frames:
+        return pd.DataFrame(columns=['scan_time', 'market', column])
+    return pd.concat(frames, ignore_index=True)
+
 # ============================================
 # 엑셀 저장 함수
 # ============================================
 
-def save_to_excel(coin, score, stage, pattern_data, volume_data, orderbook_data, indicators):
-    """엑셀에 매도 신호 저장"""
+def save_to_excel(coin, score, stage, pattern_data, volume_data, orderbook_data, indicators, profile_name=DEFAULT_PROFILE_NAME, signals=None, latency=None):
+    """엑셀에 매도 신호 저장 (latency: record_alert_latency 결과)"""
+    save_excel_rows([(coin, score, stage, pattern_data, volume_data, orderbook_data, indicators, profile_name, signals, latency)])
+
+def save_excel_rows(alerts):
+    """매도 신호 여러 건을 엑셀에 한 번에 저장 (파일 열기/저장 1번)"""
     try:
         filename = "upbit_sell_signals_v2.xlsx"
+        headers = ['시간(KST)', '코인', '매도단계', '신호강도', '현재가', '단기급락', 
+                  '12시간고점대비', '6시간변화', '거래량추세', '다이버전스', '호가비율', 
+                  'RSI', 'MACD', '볼린저', 'MA', '스토캐스틱', '프로필', '발생신호',
+                  '감지지연(초)', '실행방식']
         
         # 기존 파일 열기 또는 새로 생성
         try:
@@ -513,134 +1803,849 @@ def save_to_excel(coin, score, stage, pattern_data, volume_data, orderbook_data,
             ws.title = "매도 신호"
             
             # 헤더 작성
-            headers = ['시간(KST)', '코인', '매도단계', '신호강도', '현재가', '단기급락', 
-                      '12시간고점대비', '6시간변화', '거래량추세', '다이버전스', '호가비율', 
-                      'RSI', 'MACD', '볼린저', 'MA', '스토캐스틱']
             ws.append(headers)
-            
-            # 헤더 스타일
-            for cell in ws[1]:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="DC143C", end_color="DC143C", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center")
         
-        # 데이터 추가
-        row_data = [
-            format_kst_time(),
-            coin.replace('KRW-', ''),
-            stage,
-            f"{score}/10",
-            pattern_data['current_price'] if pattern_data else '',
-            f"-{pattern_data['quick_drop']:.1f}% ({pattern_data['minutes_since_high']}분)" if pattern_data else '',
-            f"-{pattern_data['drop_from_high_12h']:.1f}%" if pattern_data else '',
-            f"{pattern_data['surge_6h']:+.1f}%" if pattern_data else '',
-            "감소" if volume_data and volume_data['volume_declining'] else "정상",
-            "있음" if volume_data and volume_data['divergence_signal'] else "없음",
-            f"{orderbook_data['ask_bid_ratio']:.2f}" if orderbook_data else '',
-            f"{indicators['rsi']:.1f}" if indicators else '',
-            indicators['macd_signal'] if indicators else '',
-            indicators['bb_signal'] if indicators else '',
-            indicators['ma_signal'] if indicators else '',
-            f"{indicators['stoch']:.1f}" if indicators else ''
-        ]
+        # 헤더 스타일 (이전 버전 파일에 새 컬럼 헤더가 없으면 추가)
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=col)
+            if cell.value is None:
+                cell.value = header
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="DC143C", end_color="DC143C", fill_type="solid")
+            cell.alignment = Alignment(horizontal="center")
         
-        ws.append(row_data)
+        # 데이터 추가
+        for alert in alerts:
+            ws.append(_excel_row(*alert))
         
         # 100개 행만 유지
         if ws.max_row > 101:
             ws.delete_rows(2, ws.max_row - 101)
         
         wb.save(filename)
-        print(f"✅ 엑셀 저장 완료: {coin}")
+        print(f"✅ 엑셀 저장 완료: {', '.join(alert[0] for alert in alerts[:10])}{' ...' if len(alerts) > 10 else ''}")
         
     except Exception as e:
         print(f"엑셀 저장 오류: {e}")
 
+def _excel_row(coin, score, stage, pattern_data, volume_data, orderbook_data, indicators, profile_name, signals, latency=None):
+    """엑셀 1행"""
+    return [
+        format_kst_time(),
+        coin.replace('KRW-', ''),
+        stage,
+        format_signal_score(score),
+        pattern_data['current_price'] if pattern_data else '',
+        f"-{pattern_data['quick_drop']:.1f}% ({pattern_data['minutes_since_high']}분)" if pattern_data else '',
+        f"-{pattern_data['drop_from_high_12h']:.1f}%" if pattern_data else '',
+        f"{pattern_data['surge_6h']:+.1f}%" if pattern_data else '',
+        "감소" if volume_data and volume_data['volume_declining'] else "정상",
+        "있음" if volume_data and volume_data['divergence_signal'] else "없음",
+        f"{orderbook_data['ask_bid_ratio']:.2f}" if orderbook_data else '',
+        f"{indicators['rsi']:.1f}" if indicators else '',
+        indicators['macd_signal'] if indicators else '',
+        indicators['bb_signal'] if indicators else '',
+        indicators['ma_signal'] if indicators else '',
+        f"{indicators['stoch']:.1f}" if indicators else '',
+        profile_name,
+        ", ".join(signal.replace("✅ ", "") for signal in signals or []),
+        round(latency['detection_latency'], 1) if latency and latency['detection_latency'] is not None else '',
+        latency['mode'] if latency else '',
+    ]
+
+def save_latency_sheet(stats):
+    """엑셀 '감지지연' 시트에 실행방식별 p50/p95/p99 갱신 (매도 신호 파일과 같은 파일)"""
+    try:
+        filename = "upbit_sell_signals_v2.xlsx"
+        wb = load_workbook(filename)
+        if "감지지연" in wb.sheetnames:
+            del wb["감지지연"]
+        ws = wb.create_sheet("감지지연")
+        ws.append(['실행방식', '알림수', 'p50(초)', 'p95(초)', 'p99(초)', '갱신시각(KST)'])
+        for cell in ws[1]:
+            cell.font = Font(bold=True)
+            cell.alignment = Alignment(horizontal="center")
+        for mode, item in stats.items():
+            ws.append([mode, item['count'], round(item['p50'], 1), round(item['p95'], 1), round(item['p99'], 1), format_kst_time()])
+        wb.save(filename)
+    except Exception as e:
+        print(f"감지 지연 시트 저장 오류: {e}")
+
+# ============================================
+# 감지 지연 측정 (캔들 마감 → 텔레그램 수신)
+# ============================================
+
+# 실행 방식 (지연 통계를 방식별로 비교)
+MODE_CRON = "cron"
+MODE_DEADLINE = "deadline"
+MODE_DAEMON = "daemon"
+
+# 이번 실행에서 발송한 알림의 지연 기록 (save_latency_stats에서 파일에 합침)
+_latency_records = []
+
+def last_closed_candle_end(df, interval, as_of):
+    """as_of(KST naive) 시점에 이미 마감된 마지막 캔들의 마감 시각 (없으면 None)"""
+    ends = df.index + _candle_step(interval)
+    closed = ends[ends <= as_of]
+    return closed[-1] if len(closed) else None
+
+def build_alert_timing(mode, df_10m, fetched_at, scored_at):
+    """
+    알림 1건의 기준 시각 (epoch 초)
+    - candle_close: 수집 시점에 마감돼 있던 마지막 10분봉의 마감 시각 (신호를 만든 캔들)
+    - fetched_at: 이 코인 캔들 수집 완료, scored_at: 전체 점수 계산 완료
+    """
+    as_of = pd.Timestamp(datetime.fromtimestamp(fetched_at, KST).replace(tzinfo=None))
+    candle_end = last_closed_candle_end(df_10m, 'minute10', as_of)
+    return {
+        'mode': mode,
+        'candle_close': KST.localize(candle_end.to_pydatetime()).timestamp() if candle_end is not None else None,
+        'fetched_at': fetched_at,
+        'scored_at': scored_at,
+    }
+
+def record_alert_latency(coin, profile_name, timing, acked_at):
+    """
+    알림 1건의 단계별 지연(초) 기록
+    - fetch_lag: 캔들 마감 → 수집, score_lag: 수집 → 점수 계산, send_lag: 점수 계산 → 텔레그램 수신 확인
+    - detection_latency: 캔들 마감 → 텔레그램 수신 확인 (전송 실패 시 None)
+    """
+    candle_close = timing['candle_close']
+    record = {
+        'coin': coin,
+        'profile': profile_name,
+        'mode': timing['mode'],
+        'candle_close': format_kst_time(datetime.fromtimestamp(candle_close, KST)) if candle_close else None,
+        'fetch_lag': timing['fetched_at'] - candle_close if candle_close else None,
+        'score_lag': timing['scored_at'] - timing['fetched_at'],
+        'send_lag': acked_at - timing['scored_at'] if acked_at else None,
+        'detection_latency': acked_at - candle_close if acked_at and candle_close else None,
+        'recorded_at': format_kst_time(),
+    }
+    _latency_records.append(record)
+    return record
+
+def latency_percentiles(records):
+    """실행방식별 감지 지연 통계 {방식: {count, p50, p95, p99}}"""
+    by_mode = {}
+    for record in records:
+        if record['detection_latency'] is not None:
+            by_mode.setdefault(record['mode'], []).append(record['detection_latency'])
+    
+    stats = {}
+    for mode, values in by_mode.items():
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        stats[mode] = {'count': len(values), 'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+    return stats
+
+def save_latency_stats():
+    """이번 실행 기록을 LATENCY_FILE에 합치고(최근 LATENCY_WINDOW건 유지) 실행방식별 통계 반환"""
+    try:
+        with open(LATENCY_FILE, encoding='utf-8') as f:
+            records = json.load(f)
+    except FileNotFoundError:
+        records = []
+    except Exception as e:
+        print(f"감지 지연 기록 읽기 오류: {e}")
+        records = []
+    
+    records = (records + _latency_records)[-LATENCY_WINDOW:]
+    _latency_records.clear()
+    try:
+        with open(LATENCY_FILE, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"감지 지연 기록 저장 오류: {e}")
+    return latency_percentiles(records)
+
+def format_latency_stats(stats):
+    """실행방식별 p50/p95/p99 요약"""
+    return "\n".join(
+        f"   └ {mode}: p50 {item['p50']:.0f}초 / p95 {item['p95']:.0f}초 / p99 {item['p99']:.0f}초 ({item['count']}건)"
+        for mode, item in sorted(stats.items())
+    )
+
 # ============================================
 # 메인 스캔 함수
 # ============================================
 
-def scan_sell_signals():
-    """매도 신호 스캔"""
+def send_sell_alert(coin, score, signals, pattern_data, volume_data, orderbook_data, indicators, profile, context=None, timing=None, stage_info=None):
+    """
+    매도 신호 1건 발송 (프로필의 텔레그램 채팅방) + 감지 지연 기록
+    - stage_info: score_markets에서 판단한 단계 (생략 시 점수로 판단)
+    - 엑셀 행을 반환 → 스캔 끝에 save_excel_rows로 한 번에 저장 (알림마다 통합문서 저장 안 함)
+    """
+    stage_info = stage_info or determine_sell_stage(score, profile)
+    if not stage_info:
+        return None
+    
+    # 텔레그램 메시지
+    message = format_sell_telegram_message(
+        coin, score, signals, pattern_data, volume_data, 
+        orderbook_data, indicators, profile, context, stage_info
+    )
+    latency = None
+    if message:
+        result = send_telegram(message, chat_id=get_setting('CHAT_ID', profile))
+        acked_at = time.time() if result and result.get('ok') else None
+        if timing:
+            latency = record_alert_latency(coin, profile['name'], timing, acked_at)
+        print(f"✅ 매도신호 발송: {coin} ({stage_info['stage']}, {format_signal_score(score)}, {profile['name']})")
+    
+    return (coin, score, stage_info['stage'], pattern_data, volume_data, orderbook_data, indicators, profile['name'], signals, latency)
+
+def send_market_wide_alert(context, profiles, alerts):
+    """
+    시장 전체 하락 시 프로필별 묶음 알림 1건씩 발송 + 엑셀 한 번에 저장
+    - alerts: {프로필 이름: [(코인, 점수, 신호, pattern, volume, orderbook, indicators, timing), ...]}
+    """
+    rows = []
+    for profile in profiles:
+        items = alerts[profile['name']]
+        if not items:
+            continue
+        message = format_market_wide_message(context, [(item[0], item[1]) for item in items], profile)
+        result = send_telegram(message, chat_id=get_setting('CHAT_ID', profile))
+        acked_at = time.time() if result and result.get('ok') else None
+        print(f"✅ 시장 전체 알림 발송: 매도신호 {len(items)}개 묶음 ({profile['name']})")
+        for coin, score, signals, pattern_data, volume_data, orderbook_data, indicators, timing in items:
+            stage = determine_sell_stage(score, profile)['stage']
+            latency = record_alert_latency(coin, profile['name'], timing, acked_at)
+            rows.append((coin, score, stage, pattern_data, volume_data, orderbook_data, indicators, profile['name'], signals, latency))
+    if rows:
+        save_excel_rows(rows)
+
+def scan_sell_signals(deadline=None, profiles=None, state=None):
+    """
+    매도 신호 스캔
+    - deadline(초) 지정 시: 우선순위 순서로 분석하고 시간 초과 시 중단
+    - profiles: 알림 프로필 목록 (캔들/피처는 한 번만 수집·계산하고 프로필마다 점수만 계산)
+    - state: 데몬 상태 (캔들 캐시/프로세스 풀 재사용, 스캔 결과를 다음 스캔·설정 재적용에 보관)
+    """
+    if state is not None:
+        profiles = state['profiles']
+    profiles = profiles or build_profiles()
+    mode = MODE_DAEMON if state is not None else MODE_DEADLINE if deadline else MODE_CRON
     print(f"\n{'='*50}")
     print(f"🔍 매도 신호 스캔 시작 (v2.0): {format_kst_time()}")
     print(f"{'='*50}\n")
     
+    scan_start = time.monotonic()
+    # 시간 제한 모드: 캔들 수집은 예비 시간을 남기고 중단 (나머지 단계가 제한 시간 안에 끝나도록)
+    fetch_budget = deadline * (1 - DEADLINE_RESERVE_RATIO) if deadline else None
+    
     # 원화 마켓 코인 리스트
     tickers = pyupbit.get_tickers(fiat="KRW")
+    
+    # 데몬 모드: 상장폐지 등으로 빠진 코인의 캔들 캐시 정리
+    candle_cache = state['candles'] if state is not None else {}
+    for coin in set(candle_cache) - set(tickers):
+        del candle_cache[coin]
+    
+    # 시간 제한 모드: 급락폭/거래대금이 큰 코인부터 분석
+    if deadline:
+        snapshot = fetch_ticker_snapshot(tickers)
+        tickers = prioritize_markets(tickers, snapshot)
+        print(f"⏱️ 시간 제한 모드: {deadline:g}초 (우선순위 순서로 분석, 캔들 수집은 {fetch_budget:.0f}초까지)")
+    
     print(f"📊 총 {len(tickers)}개 코인 분석 중...\n")
     
     signal_count = 0
+    uncovered = []
+    markets = []
+    candles_list = []
+    fetch_times = []
     
+    # 네거티브 캐시: 격리 중인 코인은 API 호출 없이 건너뜀
+    negative_cache = load_negative_cache()
+    now = get_kst_now()
+    skipped = []
+    problems = []
+    attempted = 0
+    
+    # 1단계: 캔들 수집 (API 호출은 이 단계에서만)
     for idx, coin in enumerate(tickers, 1):
+        # 시간 초과 시 남은 코인은 미분석으로 기록하고 중단
+        if deadline and time.monotonic() - scan_start >= fetch_budget:
+            uncovered = tickers[idx - 1:]
+            break
+        
+        quarantine = get_quarantine(negative_cache, coin, now)
+        if quarantine:
+            skipped.append((coin, quarantine))
+            continue
+        
         try:
             # 진행률 표시
             if idx % 50 == 0:
                 print(f"진행률: {idx}/{len(tickers)} ({idx/len(tickers)*100:.1f}%)")
             
-            # 1단계: 가격 패턴 분석 (개선된 버전)
-            pattern_data = analyze_price_pattern(coin)
-            if not pattern_data:
-                continue
+            attempted += 1
+            candles, problem = fetch_market_candles(coin, candle_cache.get(coin))
+            if candles:
+                markets.append(coin)
+                candles_list.append(candles)
+                fetch_times.append(time.time())
+                candle_cache[coin] = candles
+                negative_cache.pop(coin, None)
+            else:
+                candle_cache.pop(coin, None)
+                problems.append((coin, problem))
             
-            # 필터링: 최소한의 변동이 있는 코인만
-            if pattern_data['quick_drop'] < MIN_QUICK_DROP and pattern_data['drop_from_high_12h'] < MIN_DROP_12H:
-                continue
+            # API 제한 방지
+            time.sleep(0.1)
             
+        except Exception as e:
+            print(f"❌ {coin} 데이터 수집 오류: {e}")
+            problems.append((coin, {'reason': REASON_FETCH_FAILED, 'detail': str(e)[:100]}))
+            continue
+    
+    # 요청 실패가 절반 이상이면 API 장애로 보고 격리하지 않음 (데이터 부족은 항상 기록)
+    failed = sum(1 for _, problem in problems if problem['reason'] == REASON_FETCH_FAILED)
+    api_outage = attempted > 0 and failed >= attempted / 2
+    if api_outage:
+        print(f"⚠️ 요청 실패 {failed}/{attempted}개 - API 장애로 판단, 실패 코인을 격리하지 않음")
+    for coin, problem in problems:
+        if problem['reason'] == REASON_FETCH_FAILED and api_outage:
+            continue
+        record_market_failure(negative_cache, coin, problem, now)
+    save_negative_cache(negative_cache)
+    
+    # 2단계: 호가창 (여러 코인 묶음 조회)
+    orderbooks = fetch_orderbooks(markets)
+    
+    # 3단계: 피처 계산 (코인이 많으면 멀티코어)
+    compute_start = time.monotonic()
+    pool = state['pool'] if state is not None else None
+    matrix = compute_feature_matrix(pack_candles(candles_list), len(markets), pool=pool)
+    for i, coin in enumerate(markets):
+        write_feature_group(matrix[i], 'orderbook', orderbooks.get(coin))
+    print(f"🧮 피처 계산 완료: {len(markets)}개 코인, {time.monotonic() - compute_start:.1f}초\n")
+    
+    # 시장 전체 지표 (모든 코인 행에 기록 → 규칙/스냅샷에서 사용)
+    context = compute_market_breadth(matrix, markets)
+    write_market_context(matrix, context)
+    market_wide = is_market_wide_drop(context)
+    if context:
+        print(f"🌐 시장 지표: {format_market_context(context)}")
+    # 시간 제한으로 중단되면 하락폭 큰 코인 위주로만 분석된 상태 → 하락 비율이 부풀려지므로 묶음 알림 안 함
+    if market_wide and uncovered:
+        market_wide = False
+        print(f"⏱️ 미분석 코인 {len(uncovered)}개 → 시장 지표가 하락 코인 위주라 시장 전체 묶음 알림 생략 (개별 알림)")
+    if market_wide:
+        print(f"🚨 하락 코인 비율 {BREADTH_ALERT_THRESHOLD:g}% 이상 → 개별 알림 대신 시장 전체 알림 1건")
+    
+    # 4단계: 프로필별 점수/발동 규칙/단계 (피처는 공유, 규칙 평가는 전체 코인 × 프로필 한 번에)
+    scores, passed, masks, stages = score_markets(matrix, profiles)
+    scored_at = time.time()
+    if state is not None:
+        state.update(
+            markets=markets, matrix=matrix, scores=scores, passed=passed, stages=stages, scanned_at=get_kst_now()
+        )
+    rules = get_signal_rules()
+    
+    # 5단계: 매도 신호 발송 (시장 전체 하락이면 모아서 1건)
+    market_alerts = {profile['name']: [] for profile in profiles}
+    excel_rows = []
+    for i, coin in enumerate(markets):
+        if not passed[:, i].any():
+            continue
+        
+        try:
+            pattern_data, volume_data, orderbook_data, indicators, _ = row_to_features(matrix[i])
+            values = feature_values(matrix[i])
+            timing = build_alert_timing(mode, candles_list[i]['minute10'], fetch_times[i], scored_at)
             print(f"🔎 {coin}: 가격 변동 감지 - 정밀 분석 중...")
             
-            # 2단계: 거래량 분석
-            volume_data = analyze_volume_decline(coin)
-            
-            # 3단계: 호가창 분석
-            orderbook_data = analyze_orderbook_sell(coin)
-            
-            # 4단계: 기술적 지표
-            indicators = calculate_sell_indicators(coin)
-            
-            # 5단계: 신호 강도 계산
-            score, signals = calculate_sell_signal_strength(
-                pattern_data, volume_data, orderbook_data, indicators
-            )
-            
-            # 6단계: 매도 신호 발송
-            if score >= SELL_STAGE_REVIEW:
-                signal_count += 1
-                stage_info = determine_sell_stage(score)
+            for p, profile in enumerate(profiles):
+                if not passed[p, i] or not stages[p, i]:
+                    continue
                 
-                if stage_info:
-                    # 텔레그램 메시지
-                    message = format_sell_telegram_message(
-                        coin, score, signals, pattern_data, volume_data, 
-                        orderbook_data, indicators
+                signal_count += 1
+                score = _score_value(scores[p, i])
+                signals = rule_signals(rules, masks[p, i], values)
+                if market_wide:
+                    market_alerts[profile['name']].append(
+                        (coin, score, signals, pattern_data, volume_data, orderbook_data, indicators, timing)
                     )
-                    if message:
-                        send_telegram(message)
-                        print(f"✅ 매도신호 발송: {coin} ({stage_info['stage']}, {score}/10)")
-                    
-                    # 엑셀 저장
-                    save_to_excel(
-                        coin, score, stage_info['stage'], pattern_data, 
-                        volume_data, orderbook_data, indicators
+                else:
+                    row = send_sell_alert(
+                        coin, score, signals, pattern_data, volume_data, orderbook_data, indicators,
+                        profile, context, timing, SELL_STAGES[stages[p, i]]
                     )
-            
-            # API 제한 방지
-            time.sleep(0.1)
+                    if row:
+                        excel_rows.append(row)
             
         except Exception as e:
             print(f"❌ {coin} 분석 오류: {e}")
             continue
     
+    if market_wide:
+        send_market_wide_alert(context, profiles, market_alerts)
+    if excel_rows:
+        save_excel_rows(excel_rows)
+    
+    # 감지 지연 통계 (최근 LATENCY_WINDOW건, 실행방식별)
+    new_latency = len(_latency_records)
+    latency_stats = save_latency_stats() if new_latency else None
+    if latency_stats:
+        save_latency_sheet(latency_stats)
+    
+    # 6단계: 전체 코인 피처 스냅샷 저장 (알림 안 간 코인 포함, 시간 제한을 넘겼으면 생략)
+    if SNAPSHOT_ENABLED and deadline and time.monotonic() - scan_start >= deadline:
+        print(f"⏱️ 시간 제한({deadline:g}초) 초과 - 피처 스냅샷 저장 생략")
+    elif SNAPSHOT_ENABLED:
+        extra_columns = {}
+        for p, profile in enumerate(profiles):
+            suffix = '' if p == 0 else f"_{profile['name']}"
+            extra_columns[f"score{suffix}"] = scores[p]
+            extra_columns[f"passed_filter{suffix}"] = passed[p]
+        save_feature_snapshot(markets, matrix, extra_columns)
+    
+    if uncovered:
+        save_uncovered_markets(uncovered, deadline, len(tickers))
+        covered = len(tickers) - len(uncovered)
+        send_telegram(
+            f"⏱️ 시간 제한({deadline:g}초) 도달: {covered}/{len(tickers)}개 분석, "
+            f"매도신호 {signal_count}개 발송\n"
+            f"미분석 {len(uncovered)}개: {', '.join(c.replace('KRW-', '') for c in uncovered[:20])}"
+            f"{' ...' if len(uncovered) > 20 else ''}"
+        )
+    
     print(f"\n{'='*50}")
     print(f"✅ 스캔 완료: 총 {signal_count}개 매도신호 발견")
+    if uncovered:
+        print(f"⏱️ 시간 초과로 {len(uncovered)}개 코인 미분석")
+    
+    if latency_stats:
+        print(f"⏱️ 감지 지연 (캔들 마감 → 텔레그램 수신, 이번 {new_latency}건 포함 최근 기록):")
+        print(format_latency_stats(latency_stats))
+    
+    if use_shared_cache():
+        totals = shared_cache.flush_stats(shared_cache_dir())
+        stats = shared_cache.STATS
+        print(f"🗄️ 공유 캐시: 이 프로세스 적중률 {shared_cache.hit_rate(stats):.0f}% "
+              f"(적중 {stats['hits']}, 대기 후 적중 {stats['coalesced']}, 요청 {stats['misses']}) / "
+              f"서버 전체 {shared_cache.hit_rate(totals):.0f}%")
+    
+    # 이번 스캔에서 건너뛴 코인 (격리 중 + 이번에 새로 격리)
+    skipped += [(coin, negative_cache[coin]) for coin, _ in problems if coin in negative_cache]
+    if skipped:
+        print(f"🚫 건너뛴 코인 {len(skipped)}개")
+        print(format_skipped_markets(skipped))
     print(f"{'='*50}\n")
 
+# ============================================
+# 조회용 HTTP 엔드포인트 (데몬 모드)
+# ============================================
+
+# 경로 → 미리 직렬화한 JSON (스캔/재계산 후 통째로 교체, 요청 처리 중에는 읽기만)
+_query_responses = {}
+_query_server = None
+
+def _json_bytes(data):
+    """응답 본문 (NaN/inf는 _json_value에서 null로 바꿔서 전달)"""
+    return json.dumps(data, ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+def _json_value(value):
+    """피처 값 → JSON 값 (NaN/inf → None, 예: 기준일 거래량 0이면 volume_change = inf)"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def _market_result(state, p, i):
+    """코인 i의 프로필 p 결과 {score, stage, passed_filter}"""
+    score = state['scores'][p, i]
+    stage_info = SELL_STAGES[state['stages'][p, i]]
+    return {
+        'score': None if np.isnan(score) else _score_value(score),
+        'stage': stage_info['stage'] if stage_info else None,
+        'passed_filter': bool(state['passed'][p, i]),
+    }
+
+def build_query_responses(state):
+    """
+    마지막 스캔 결과 → {경로: JSON bytes}
+    - /markets/<코인>: 피처 벡터 + 프로필별 점수/단계 + 스캔 시각
+    - /top, /top/<프로필>: 점수 상위 QUERY_TOP_N개
+    - /: 스캔 시각, 코인 수, 프로필 목록
+    """
+    scanned_at = format_kst_time(state['scanned_at']) if state['scanned_at'] else None
+    updated_at = format_kst_time()
+    profiles = state['profiles']
+    markets = state['markets']
+    responses = {}
+    
+    for i, coin in enumerate(markets):
+        features = {column: _json_value(value) for column, value in feature_values(state['matrix'][i]).items()}
+        responses[f"/markets/{coin}"] = _json_bytes({
+            'market': coin,
+            'scanned_at': scanned_at,
+            'updated_at': updated_at,
+            'profiles': {profile['name']: _market_result(state, p, i) for p, profile in enumerate(profiles)},
+            'features': features,
+        })
+    
+    for p, profile in enumerate(profiles):
+        scores = np.nan_to_num(state['scores'][p], nan=-np.inf) if markets else np.array([])
+        order = np.argsort(-scores, kind='stable')[:QUERY_TOP_N]
+        top = [{'market': markets[i], **_market_result(state, p, i)} for i in order if np.isfinite(scores[i])]
+        body = _json_bytes({'profile': profile['name'], 'scanned_at': scanned_at, 'updated_at': updated_at, 'top': top})
+        responses[f"/top/{profile['name']}"] = body
+        if p == 0:
+            responses["/top"] = body
+    
+    responses["/"] = _json_bytes({
+        'scanned_at': scanned_at,
+        'updated_at': updated_at,
+        'markets': len(markets),
+        'profiles': [profile['name'] for profile in profiles],
+        'endpoints': ["/markets/<코인>", "/top", "/top/<프로필>"],
+    })
+    return responses
+
+def publish_query_results(state):
+    """
+    조회 응답 교체 (dict 참조 1번 바꿔치기 → 요청 스레드는 항상 완성된 결과만 봄)
+    - 응답 생성에 실패하면 로그만 남기고 마지막 정상 응답 유지 (데몬은 계속 실행)
+    """
+    global _query_responses
+    if _query_server is None or state['scores'] is None:
+        return
+    try:
+        _query_responses = build_query_responses(state)
+    except Exception as e:
+        print(f"❌ 조회 응답 갱신 실패 (이전 결과 유지): {e}")
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """미리 만든 JSON만 돌려줌 (요청마다 분석/업비트 호출 없음)"""
+    
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path).rstrip('/') or '/'
+        body = _query_responses.get(path)
+        status = 200
+        if body is None:
+            status = 404
+            body = _json_bytes({'error': f"결과 없음: {path}"})
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """요청 로그는 출력하지 않음 (스캔 로그와 섞이지 않도록)"""
+
+def start_query_server(port=None):
+    """
+    조회용 HTTP 서버를 백그라운드 스레드로 시작
+    - port 생략 시 QUERY_SERVER_PORT (0이면 시작하지 않고 None)
+    - port=0을 직접 넘기면 빈 포트 자동 선택 (server.server_address[1]로 확인)
+    """
+    global _query_responses, _query_server
+    if port is None:
+        if not QUERY_SERVER_PORT:
+            return None
+        port = QUERY_SERVER_PORT
+    _query_responses = {"/": _json_bytes({'scanned_at': None, 'markets': 0, 'status': "첫 스캔 진행 중"})}
+    server = ThreadingHTTPServer((QUERY_SERVER_HOST, port), QueryHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _query_server = server
+    print(f"🌐 조회 엔드포인트: http://{QUERY_SERVER_HOST}:{server.server_address[1]}/ (/markets/<코인>, /top)")
+    return server
+
+# ============================================
+# 데몬 모드 (config.py 변경 시 스캔 사이에 재적용)
+# ============================================
+
+# 설정 변경 시 다시 만들어야 하는 단계 (위에서부터 비쌈)
+INVALIDATE_REFILL = "캔들 재수집"
+INVALIDATE_POOL = "프로세스 풀 재시작"
+INVALIDATE_FEATURES = "피처 재계산"
+INVALIDATE_BREADTH = "시장 지표 재계산"
+INVALIDATE_LABELS = "지표 라벨 갱신"
+INVALIDATE_SCORES = "점수 재계산"
+
+# 캔들 개수 설정 → 다시 받아야 하는 타임프레임
+CANDLE_CONFIG_KEYS = {'MINUTE_10_COUNT': 'minute10', 'MINUTE_60_COUNT': 'minute60'}
+
+def new_daemon_state(profiles):
+    """데몬 상태: 코인별 캔들 캐시, 프로세스 풀, 마지막 스캔 결과"""
+    workers = compute_workers()
+    return {
+        'profiles': profiles,
+        'candles': {},
+        'pool': ProcessPoolExecutor(max_workers=workers) if workers > 1 else None,
+        'markets': [],
+        'matrix': np.empty((0, len(FEATURE_COLUMNS))),
+        'scores': None,
+        'passed': None,
+        'stages': None,
+        'scanned_at': None,
+    }
+
+def load_config_values(path):
+    """config.py 실행 결과의 설정값 (대문자 이름만, 모듈 import 없이)"""
+    values = runpy.run_path(path)
+    return {key: value for key, value in values.items() if key.isupper()}
+
+def _same_value(old, new):
+    """설정값 비교 (비교 중 오류가 나면 바뀐 것으로 간주)"""
+    try:
+        return bool(old == new)
+    except Exception:
+        return False
+
+def diff_config(values):
+    """
+    새 config.py 값 → 현재 값과 다른 설정 {키: (이전 값, 새 값)}
+    - config.py에서 빠진 설정은 기본값으로 되돌림 (기본값이 없으면 ValueError)
+    - 숫자 설정에 숫자가 아닌 값이 들어오면 ValueError
+    """
+    current = {key: value for key, value in globals().items() if key.isupper()}
+    target = dict(values)
+    for key in set(current) - set(values):
+        if key in _DEFAULT_SETTINGS:
+            target[key] = _DEFAULT_SETTINGS[key]
+        elif key in _CONFIG_KEYS:
+            raise ValueError(f"'{key}' 설정이 config.py에서 빠졌습니다")
+    
+    changes = {}
+    for key, value in target.items():
+        old = current.get(key)
+        if key in current and _same_value(old, value):
+            continue
+        if isinstance(old, (int, float)) and not isinstance(old, bool) and not isinstance(value, (int, float)):
+            raise ValueError(f"'{key}' 값은 숫자여야 합니다: {value!r}")
+        changes[key] = (old, value)
+    return changes
+
+def plan_invalidation(changed_keys, old_rule_keys):
+    """
+    바뀐 설정키 → 다시 만들 단계 목록 (나머지 설정은 다음 스캔부터 적용)
+    - 캔들 개수 → 캔들 재수집 / 룩백 등 피처 설정 → 캐시 캔들로 피처 재계산
+    - RSI/스토캐스틱/볼린저 기준 → 라벨만 갱신 후 점수 재계산
+    - 프로필/규칙/점수 기준 → 점수 재계산만
+    """
+    score_keys = (
+        set(PROFILE_KEYS) | set(STAGE_KEYS) | {'PROFILES', 'SIGNAL_RULES'}
+        | old_rule_keys | rule_setting_keys(get_signal_rules())
+    )
+    score_keys.discard('CHAT_ID')
+    
+    stages = []
+    if changed_keys & set(CANDLE_CONFIG_KEYS):
+        stages.append(INVALIDATE_REFILL)
+    if 'COMPUTE_WORKERS' in changed_keys:
+        stages.append(INVALIDATE_POOL)
+    if changed_keys & (set(FEATURE_CONFIG_KEYS) - set(LABEL_CONFIG_KEYS)):
+        stages.append(INVALIDATE_FEATURES)
+    if 'BREADTH_DROP_1H' in changed_keys:
+        stages.append(INVALIDATE_BREADTH)
+    if changed_keys & set(LABEL_CONFIG_KEYS):
+        stages.append(INVALIDATE_LABELS)
+    if stages or changed_keys & score_keys:
+        stages.append(INVALIDATE_SCORES)
+    return stages
+
+def apply_invalidation(state, stages, changed_keys, profiles):
+    """
+    마지막 스캔 결과 중 바뀐 설정에 영향받는 부분만 다시 계산 (API 호출 없음)
+    - 캔들 재수집은 해당 타임프레임 캐시만 비우고 다음 스캔에서 다시 받음 (피처/점수도 그때 계산)
+    - 계산이 모두 끝난 뒤에 state를 바꿈 → 중간에 실패하면 state는 그대로 (예외는 호출한 쪽에서 처리)
+    - 반환: 실제로 다시 만든 단계 목록
+    """
+    pool = state['pool']
+    if INVALIDATE_POOL in stages:
+        workers = compute_workers()
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    
+    try:
+        if INVALIDATE_REFILL in stages:
+            done = [stage for stage in stages if stage in (INVALIDATE_REFILL, INVALIDATE_POOL)]
+            updates = {'profiles': profiles}
+        else:
+            done = list(stages)
+            updates = _recompute_results(state, stages, profiles, pool)
+    except Exception:
+        if pool is not state['pool'] and pool is not None:
+            pool.shutdown()
+        raise
+    
+    if pool is not state['pool']:
+        if state['pool'] is not None:
+            state['pool'].shutdown()
+        state['pool'] = pool
+    if INVALIDATE_REFILL in stages:
+        intervals = {CANDLE_CONFIG_KEYS[key] for key in changed_keys & set(CANDLE_CONFIG_KEYS)}
+        for candles in state['candles'].values():
+            for interval in intervals:
+                candles.pop(interval, None)
+    state.update(updates)
+    return done
+
+def _recompute_results(state, stages, profiles, pool):
+    """캐시된 캔들/피처로 피처 → 시장 지표 → 점수 재계산 → state에 반영할 값 (state는 바꾸지 않음)"""
+    markets = state['markets']
+    matrix = state['matrix']
+    if INVALIDATE_FEATURES in stages and markets:
+        # 호가창은 피처 설정과 무관 → 지난 스캔 값 유지
+        orderbook = group_columns('orderbook')
+        candles_list = [state['candles'][coin] for coin in markets]
+        recomputed = compute_feature_matrix(pack_candles(candles_list), len(markets), pool=pool)
+        recomputed[:, orderbook] = matrix[:, orderbook]
+        matrix = recomputed
+    else:
+        matrix = matrix.copy()
+        if INVALIDATE_LABELS in stages:
+            relabel_indicator_signals(matrix)
+    
+    # 시장 지표는 피처(1시간 변화/단기급락)에서 계산
+    if INVALIDATE_FEATURES in stages or INVALIDATE_BREADTH in stages:
+        write_market_context(matrix, compute_market_breadth(matrix, markets))
+    
+    scores, passed, _, sell_stages = score_markets(matrix, profiles)
+    return {'profiles': profiles, 'matrix': matrix, 'scores': scores, 'passed': passed, 'stages': sell_stages}
+
+def _format_setting(value):
+    """설정값 출력용 (긴 값은 자름)"""
+    text = repr(value)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+def reload_config(path, state):
+    """
+    config.py 재적용 (스캔 사이에만 호출)
+    - 새 값을 적용 → 규칙/프로필 검증 → 실패하면 이전 값으로 되돌림 (부분 적용 없음)
+    - 성공하면 바뀐 설정에 영향받는 결과만 무효화하고 걸린 시간/무효화 범위 출력
+    - 반환: 다시 만든 단계 목록 (실패 시 None)
+    """
+    start = time.perf_counter()
+    old_rule_keys = rule_setting_keys(get_signal_rules())
+    try:
+        changes = diff_config(load_config_values(path))
+    except Exception as e:
+        print(f"❌ 설정 재적용 실패 (이전 설정 유지): {e}")
+        return None
+    if not changes:
+        return []
+    
+    # 검증 + 재계산까지 끝나야 적용 (어디서 실패하든 이전 설정/스캔 결과 유지)
+    previous = {key: globals()[key] for key in changes if key in globals()}
+    globals().update({key: new for key, (_, new) in changes.items()})
+    try:
+        validate_signal_rules(get_signal_rules())
+        profiles = build_profiles()
+        planned = plan_invalidation(set(changes), old_rule_keys)
+        stages = apply_invalidation(state, planned, set(changes), profiles)
+    except Exception as e:
+        for key in changes:
+            if key in previous:
+                globals()[key] = previous[key]
+            else:
+                globals().pop(key, None)
+        print(f"❌ 설정 재적용 실패 (이전 설정 유지): {e}")
+        return None
+    elapsed = time.perf_counter() - start
+    
+    print(f"\n🔄 설정 재적용 ({elapsed * 1000:.1f}ms): {len(changes)}개 변경")
+    for key, (old, new) in sorted(changes.items()):
+        print(f"   └ {key}: {_format_setting(old)} → {_format_setting(new)}")
+    if stages:
+        print(f"   무효화: {', '.join(stages)}")
+    else:
+        print("   무효화 없음 (다음 스캔부터 적용)")
+    if INVALIDATE_SCORES in stages and state['scores'] is not None:
+        signals = int((state['passed'] & (state['stages'] > 0)).sum())
+        print(f"   재계산 결과: 매도신호 {signals}개 (코인 {len(state['markets'])}개, 다음 스캔부터 알림)")
+    return stages
+
+def run_daemon(deadline=None):
+    """
+    데몬 모드: DAEMON_INTERVAL초마다 스캔, 대기 중에는 config.py 변경 감시
+    - 캔들 캐시/프로세스 풀/HTTP 연결을 스캔 사이에 유지
+    - 캔들 개수가 바뀌면 기다리지 않고 바로 다시 스캔 (재수집)
+    - QUERY_SERVER_PORT 지정 시 스캔/재계산 결과를 HTTP로 조회 가능
+    """
+    config_path = sys.modules['config'].__file__
+    config_mtime = os.stat(config_path).st_mtime_ns
+    state = new_daemon_state(build_profiles())
+    print(f"🛰️ 데몬 모드: {DAEMON_INTERVAL:g}초 간격, {config_path} 변경 시 자동 재적용\n")
+    server = start_query_server()
+    
+    try:
+        while True:
+            scan_sell_signals(deadline=deadline, state=state)
+            publish_query_results(state)
+            scan_end = time.monotonic()
+            
+            # DAEMON_INTERVAL도 재적용 대상이라 매번 다시 계산
+            while time.monotonic() < scan_end + DAEMON_INTERVAL:
+                time.sleep(max(0, min(CONFIG_WATCH_SECONDS, scan_end + DAEMON_INTERVAL - time.monotonic())))
+                try:
+                    mtime = os.stat(config_path).st_mtime_ns
+                except OSError:
+                    continue
+                if mtime == config_mtime:
+                    continue
+                config_mtime = mtime
+                stages = reload_config(config_path, state)
+                if stages and INVALIDATE_REFILL in stages:
+                    break
+                if stages:
+                    publish_query_results(state)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if state['pool'] is not None:
+            state['pool'].shutdown()
+
 # ============================================
 # 메인 실행
 # ============================================
 
+def parse_args():
+    """커맨드라인 옵션"""
+    parser = argparse.ArgumentParser(description="업비트 매도 신호 모니터링 v2.0")
+    parser.add_argument(
+        "--deadline", type=float, default=None,
+        help="스캔 시간 제한(초). 우선순위가 높은 코인부터 분석하고 시간이 다 되면 중단"
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="계속 실행하며 DAEMON_INTERVAL초마다 스캔 (config.py 변경은 스캔 사이에 자동 재적용)"
+    )
+    parser.add_argument(
+        "--benchmark", type=int, nargs="?", const=5000, default=None, metavar="N",
+        help="합성 코인 N개(기본 5000)로 피처 계산 단계 멀티코어 벤치마크 (API/텔레그램 호출 없음)"
+    )
+    parser.add_argument(
+        "--bootstrap", nargs=2, default=None, metavar=("START", "END"),
+        help="과거 캔들 [START, END) 구간을 캐시에 채움 (KST, 예: 2025-01-01 '2025-02-01 12:00')"
+    )
+    parser.add_argument(
+        "--interval", default="minute10", choices=sorted(INTERVAL_MINUTES),
+        help="--bootstrap 타임프레임 (기본 minute10)"
+    )
+    parser.add_argument(
+        "--markets", default=None,
+        help="--bootstrap 대상 코인 (쉼표 구분, 기본 원화 마켓 전체)"
+    )
+    return parser.parse_args()
+
 def main():
     """메인 실행 함수"""
+    args = parse_args()
+    
+    if args.benchmark:
+        run_benchmark(args.benchmark)
+        return
+    
+    if args.bootstrap:
+        markets = args.markets.split(",") if args.markets else pyupbit.get_tickers(fiat="KRW")
+        bootstrap_history(markets, args.interval, *args.bootstrap)
+        return
+    
     print("""
     ╔══════════════════════════════════════╗
     ║   업비트 매도 신호 모니터링 v2.0     ║
@@ -649,6 +2654,16 @@ def main():
     ╚══════════════════════════════════════╝
     """)
     
+    # 신호 규칙 / 알림 프로필 확인
+    try:
+        validate_signal_rules(get_signal_rules())
+        profiles = build_profiles()
+    except ValueError as e:
+        print(f"❌ 설정 오류: {e}")
+        exit(1)
+    if len(profiles) > 1:
+        print(f"👥 알림 프로필 {len(profiles)}개: {', '.join(profile['name'] for profile in profiles)}\n")
+    
     # 텔레그램 연결 테스트
     print(f"📱 텔레그램 연결 테스트 중... (Chat ID: {CHAT_ID})")
     test_result = send_telegram(f"🔴 업비트 매도 신호 모니터링 v2.0 시작! (KST: {format_kst_time()})")
@@ -662,7 +2677,10 @@ def main():
     
     # 메인 스캔 실행
     try:
-        scan_sell_signals()
+        if args.daemon:
+            run_daemon(deadline=args.deadline)
+        else:
+            scan_sell_signals(deadline=args.deadline, profiles=profiles)
         
     except KeyboardInterrupt:
         print("\n\n🛑 매도 모니터링 중지됨")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업비트 시세 공유 캐시 (같은 서버의 매수/매도 모니터가 함께 사용)
+- 저장소: tmpfs(/dev/shm) 폴더에 항목별 파일 → 여러 프로세스가 읽고 채움 (재부팅 시 삭제)
+- 항목마다 만료 시각 (캔들: 진행 중인 봉이 끝날 때까지, 호가창: 몇 초)
+- single-flight: 항목별 파일 잠금 → 같은 키를 동시에 요청해도 업비트 요청은 1번,
+  나머지 프로세스는 잠금을 기다렸다가 받아진 결과를 사용
+- 적중률 통계: 프로세스별 + 서버 전체 누적 (stats.json)
+- 항목은 pickle → 캐시 폴더는 이 사용자 소유 + 다른 사용자 권한 없음(0700)일 때만 사용
+  (다른 사용자가 먼저 만든 /dev/shm/upbit_cache에 심어둔 파일을 읽지 않도록)
+- 캔들 항목(candles/<interval>/<market>)은 pyupbit.get_ohlcv와 같은 DataFrame 그대로 저장
+  (매수/매도 모니터가 같은 키를 읽고 쓰므로 형식을 바꾸지 말 것)
+
+사용 예 (매수 모니터 쪽):
+    import upbit_shared_cache as shared_cache
+    df = shared_cache.get_or_fetch(
+        shared_cache.default_cache_dir(), "candles/minute10/KRW-BTC",
+        lambda: pyupbit.get_ohlcv("KRW-BTC", interval="minute10", count=72), ttl=60,
+        accept=lambda df: len(df) >= 72  # 매도 모니터가 더 길게 받아뒀을 수 있음
+    ).tail(72)
+"""
+
+import os
+import stat
+import time
+import json
+import pickle
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금이 없으므로 공유 캐시 사용 안 함
+    fcntl = None
+
+# 이 프로세스의 캐시 통계 (flush_stats 전까지 서버 전체 통계에 반영 안 됨)
+# - hits: 캐시에 있었음
+# - coalesced: 다른 프로세스가 받는 중이라 기다렸다가 그 결과 사용 (업비트 요청 없음)
+# - misses: 직접 업비트에 요청
+STATS = {'hits': 0, 'coalesced': 0, 'misses': 0}
+_unflushed = dict(STATS)
+
+# 확인을 마친 캐시 폴더 → None(사용 가능) 또는 PermissionError
+_checked_dirs = {}
+
+def is_supported():
+    """이 OS에서 공유 캐시를 쓸 수 있는지 (파일 잠금 필요)"""
+    return fcntl is not None
+
+def default_cache_dir():
+    """기본 캐시 폴더: 메모리 기반 /dev/shm (없으면 임시 폴더)"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "upbit_cache")
+
+def check_cache_dir(cache_dir):
+    """
+    캐시 폴더 확인 (없으면 0700으로 생성, 폴더별 1번만 검사)
+    - 심볼릭 링크가 아닌 폴더 + 이 프로세스 사용자 소유 + 그룹/다른 사용자 권한 없음
+    - 아니면 PermissionError (pickle 항목을 읽으면 코드가 실행될 수 있으므로 사용하지 않음)
+    """
+    if cache_dir not in _checked_dirs:
+        error = None
+        try:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            info = os.lstat(cache_dir)
+            if not stat.S_ISDIR(info.st_mode):
+                error = PermissionError(f"공유 캐시 폴더가 아닙니다 (심볼릭 링크 등): {cache_dir}")
+            elif info.st_uid != os.getuid():
+                error = PermissionError(f"공유 캐시 폴더 소유자가 다른 사용자입니다: {cache_dir}")
+            elif info.st_mode & 0o077:
+                error = PermissionError(
+                    f"공유 캐시 폴더를 다른 사용자도 사용할 수 있습니다 (권한 {stat.S_IMODE(info.st_mode):o}, 0700 필요): {cache_dir}"
+                )
+        except OSError as e:
+            error = PermissionError(f"공유 캐시 폴더를 사용할 수 없습니다: {e}")
+        _checked_dirs[cache_dir] = error
+    if _checked_dirs[cache_dir] is not None:
+        raise _checked_dirs[cache_dir]
+
+def _path(cache_dir, key, suffix):
+    """키('candles/minute10/KRW-BTC') → 파일 경로"""
+    return os.path.join(cache_dir, *key.split("/")) + suffix
+
+@contextmanager
+def _locked(cache_dir, key):
+    """키별 배타 잠금 (다른 프로세스가 잡고 있으면 풀릴 때까지 대기)"""
+    path = _path(cache_dir, key, ".lock")
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _read(cache_dir, key, accept=None):
+    """
+    만료되지 않은 항목 → (True, 값), 없거나 만료/accept 불만족이면 (False, None)
+    - 다른 프로세스가 쓴 항목이 깨졌거나 형식이 달라도(읽기/accept 예외) 없는 것으로 처리
+    """
+    try:
+        with open(_path(cache_dir, key, ".pkl"), "rb") as f:
+            expires_at, value = pickle.load(f)
+        if time.time() >= expires_at or (accept and not accept(value)):
+            return False, None
+    except Exception:
+        return False, None
+    return True, value
+
+def _write(cache_dir, key, value, ttl):
+    """항목 저장 (임시 파일 → 이름 변경으로 원자적 저장, 읽는 쪽은 잠금 불필요)"""
+    path = _path(cache_dir, key, ".pkl")
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((time.time() + ttl, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def _count(event, n=1):
+    """통계 집계"""
+    STATS[event] += n
+    _unflushed[event] += n
+
+def get_or_fetch(cache_dir, key, fetch, ttl, accept=None):
+    """
+    캐시 조회, 없으면 fetch()로 받아서 ttl초 동안 저장
+    - accept(값): 캐시 값을 그대로 써도 되는지 (예: 캔들 개수가 충분한지)
+    - fetch()가 None이면 저장하지 않음 (실패는 공유하지 않음)
+    - 캐시 폴더가 안전하지 않으면 PermissionError (check_cache_dir)
+    """
+    check_cache_dir(cache_dir)
+    found, value = _read(cache_dir, key, accept)
+    if found:
+        _count('hits')
+        return value
+    
+    with _locked(cache_dir, key):
+        # 잠금을 기다리는 동안 다른 프로세스가 채웠으면 그대로 사용
+        found, value = _read(cache_dir, key, accept)
+        if found:
+            _count('coalesced')
+            return value
+        
+        _count('misses')
+        value = fetch()
+        if value is not None and ttl > 0:
+            _write(cache_dir, key, value, ttl)
+        return value
+
+def get_many_or_fetch(cache_dir, namespace, names, fetch_many, ttl):
+    """
+    여러 항목 묶음 조회 (호가창처럼 한 번에 여러 코인을 요청하는 API용)
+    - 캐시에 없는 이름만 모아서 fetch_many(이름 목록) → {이름: 값} 1번 호출
+    - namespace 단위로 잠금 → 동시에 요청한 프로세스는 한쪽이 받은 결과를 사용
+    """
+    check_cache_dir(cache_dir)
+    values = {}
+    missing = []
+    for name in names:
+        found, value = _read(cache_dir, f"{namespace}/{name}")
+        if found:
+            values[name] = value
+        else:
+            missing.append(name)
+    _count('hits', len(values))
+    if not missing:
+        return values
+    
+    with _locked(cache_dir, namespace):
+        still_missing = []
+        for name in missing:
+            found, value = _read(cache_dir, f"{namespace}/{name}")
+            if found:
+                values[name] = value
+            else:
+                still_missing.append(name)
+        _count('coalesced', len(missing) - len(still_missing))
+        
+        if still_missing:
+            _count('misses', len(still_missing))
+            fetched = fetch_many(still_missing)
+            for name, value in fetched.items():
+                if value is not None and ttl > 0:
+                    _write(cache_dir, f"{namespace}/{name}", value, ttl)
+            values.update(fetched)
+    return values
+
+def hit_rate(stats):
+    """적중률(%) = 업비트 요청 없이 처리한 비율"""
+    total = stats['hits'] + stats['coalesced'] + stats['misses']
+    return (stats['hits'] + stats['coalesced']) / total * 100 if total else 0.0
+
+def flush_stats(cache_dir):
+    """이 프로세스의 미반영 통계를 서버 전체 통계(stats.json)에 더함 → 서버 전체 누적값 반환"""
+    check_cache_dir(cache_dir)
+    with _locked(cache_dir, "stats"):
+        path = os.path.join(cache_dir, "stats.json")
+        try:
+            with open(path, encoding='utf-8') as f:
+                totals = json.load(f)
+        except (FileNotFoundError, ValueError):
+            totals = {event: 0 for event in STATS}
+        for event, n in _unflushed.items():
+            totals[event] = totals.get(event, 0) + n
+            _unflushed[event] = 0
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(totals, f)
+        os.replace(tmp_path, path)
+    return totals